@@ -0,0 +1,341 @@
+"""
+    asyncio based EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import asyncio
+import errno
+import inspect
+import logging
+import math
+import os
+
+from common import *
+from AsyncEIBConnection import AsyncEIBConnection
+from EIBClient import EIBClientFactory, EIBClientListener, EIBListenerIndex
+from EIBConnection import EIBAddr, EIBBuffer
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncEIBClient(object):
+    """
+    asyncio implementation of an EIB/KNX client
+    Mimics the behavior of _EIBClient, all requests are coroutines sharing the event loop of the caller
+    """
+
+    def __init__(self):
+        self.__EIBConnection = None
+        self.__EIBPort = None
+        # separate connection in group socket mode used for writing group values
+        self.__groupSocket = None
+        self.__groupSocketLock = asyncio.Lock()
+
+    async def flush(self):
+        """
+        closes socket connection and reset all instance variables
+        """
+        if self.__EIBConnection and self.__EIBConnection.fd:
+            await self.__EIBConnection.EIBClose()
+        self.__EIBConnection = None
+        await self.__closeGroupSocket()
+
+    def getEIBConnection(self) -> AsyncEIBConnection:
+        return self.__EIBConnection
+
+    async def setEIBConnection(self, port):
+        """
+        Establishes the socket connection
+        """
+        self.__EIBConnection = await AsyncEIBClient.createConnection(port)
+        self.__EIBPort = port
+
+    @staticmethod
+    async def createConnection(port) -> AsyncEIBConnection:
+        """
+        :param port:    socket path or host[:port] of the daemon
+        :return:        established connection
+        """
+        c = AsyncEIBConnection()
+        if port[0] == '/':
+            await c.EIBSocketLocal(port)
+        else:
+            parts = port.split(':')
+            if len(parts) == 1:
+                parts.append(6720)
+            await c.EIBSocketRemote(parts[0], int(parts[1]))
+        return c
+
+    async def GroupCache_Read(self, addrSrc, age=None, dpt=None):
+        """
+        reads value from local cache
+        if the client side value cache is enabled and holds a value not older than age, the daemon is not requested
+        :param      addrSrc: KNX address with "/" separator
+        :param      age: maximum age of the value in seconds, knxd reads the value from the bus if older,
+                    fractions are rounded up to the whole seconds knxd supports, None to accept any cached value
+        :param      dpt: datapoint type ("9.001") to return the decoded native value
+        :return:    native value if dpt is given, otherwise string representation of hexified value in cache
+        :raises:    ValueError
+        """
+        gaddrInt = readgaddr(addrSrc)
+        cache = EIBClientFactory.getValueCache()
+        if cache is not None:
+            entry = cache.get(gaddrInt, age)
+            if entry is not None:
+                return convertValue(entry.raw, dpt)
+
+        buf = EIBBuffer()
+        src = EIBAddr()
+
+        # call group cache
+        if age is None:
+            rlen = await self.__EIBConnection.EIB_Cache_Read(gaddrInt,
+                                                             src,
+                                                             buf)
+        else:
+            rlen = await self.__EIBConnection.EIB_Cache_Read_Sync(gaddrInt,
+                                                                  src,
+                                                                  buf,
+                                                                  math.ceil(age))
+
+        if rlen == -1:
+            raise ValueError("Read failed - " + os.strerror(self.__EIBConnection.errno))
+        elif len(buf.raw) < 2:
+            raise ValueError("Buffer size too small - {0}: {1}".format(addrSrc,
+                                                                       buf.raw))
+
+        return convertValue(buf.raw, dpt)
+
+    async def Group_Write_DPTVal(self, addrDest, val, dpt=None):
+        """
+        writes a value to a group address via the persistent group socket
+        :param addrDest:    KNX address with "/" separator
+        :param val:         native value if dpt is given, otherwise value as hex string "44 B1 00 01"
+        :param dpt:         datapoint type ("9.001") of the native value
+        :return:            1 on success
+        :raises:            ValueError for invalid values, ConnectionError if sending failed
+        """
+        lbuf = readValue(val, dpt)
+
+        async with self.__groupSocketLock:
+            con = await self.__getGroupSocket()
+            try:
+                length = await con.EIBSendGroup(readgaddr(addrDest), lbuf)
+            except OSError as e:
+                # drop broken connection, next write reconnects
+                await self.__closeGroupSocket()
+                raise ConnectionError("Send request failed - " + str(e))
+            if length == -1:
+                await self.__closeGroupSocket()
+                raise ConnectionError("Send request failed")
+
+        # report success
+        return 1
+
+    async def Group_Write_Many(self, writes):
+        """
+        writes values to multiple group addresses, e.g. for scenes
+        all telegrams are encoded up front and sent with a single write on the group socket
+        :param writes:  list of tuples (KNX address with "/" separator, value as hex string "44 B1 00 01")
+                        resp. (KNX address with "/" separator, native value, datapoint type "9.001")
+        :return:        1. value: list of addresses written, 2. value: dict of address to error message
+        :raises:        ConnectionError if the group socket cannot be opened
+        """
+        errors = {}
+        addrDests = []
+        dests = []
+        apdus = []
+        for write in writes:
+            addrDest = write[0]
+            try:
+                dest = readgaddr(addrDest)
+                apdu = readValue(write[1], write[2] if len(write) > 2 else None)
+            except ValueError as e:
+                errors[addrDest] = str(e)
+                continue
+            dests.append(dest)
+            apdus.append(apdu)
+            addrDests.append(addrDest)
+
+        async with self.__groupSocketLock:
+            con = await self.__getGroupSocket()
+            results = await con.EIBSendGroup_Many(dests, apdus)
+            if any(result == -1 and err != errno.EINVAL for result, err in results):
+                # drop broken connection, next write reconnects
+                await self.__closeGroupSocket()
+
+        written = []
+        for addrDest, (result, err) in zip(addrDests, results):
+            if result == -1:
+                errors[addrDest] = "Send request failed - " + os.strerror(err)
+            else:
+                written.append(addrDest)
+        return written, errors
+
+    async def __getGroupSocket(self) -> AsyncEIBConnection:
+        """
+        group socket is opened on first write and kept for all further writes to any group address
+        """
+        if self.__groupSocket is None:
+            con = await AsyncEIBClient.createConnection(self.__EIBPort)
+            if await con.EIBOpen_GroupSocket(1) == -1:
+                await con.EIBClose()
+                raise ConnectionError("Connect failed")
+            self.__groupSocket = con
+        return self.__groupSocket
+
+    async def __closeGroupSocket(self):
+        if self.__groupSocket is not None and self.__groupSocket.fd:
+            await self.__groupSocket.EIBClose()
+        self.__groupSocket = None
+
+
+class AsyncEIBClientFactory(object):
+    """
+    Factory for asyncio based EIB/KNX client creation
+    Counterpart of EIBClientFactory, clients and monitor run within the event loop of the caller
+    """
+    __factoryInstance = None
+    __clientInstance = None
+    __clientMonitorInstance = None
+    __clientLock = asyncio.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """
+        setup of AsyncEIBClientFactory singleton instance
+        """
+        if AsyncEIBClientFactory.__factoryInstance is None:
+            AsyncEIBClientFactory.__factoryInstance = object.__new__(cls)
+        return AsyncEIBClientFactory.__factoryInstance
+
+    @staticmethod
+    async def getClient() -> AsyncEIBClient:
+        async with AsyncEIBClientFactory.__clientLock:
+            client = AsyncEIBClientFactory.__clientInstance
+            if client is None or client.getEIBConnection() is None:
+                client = await AsyncEIBClientFactory.__initializeNewClient()
+                AsyncEIBClientFactory.__clientInstance = client
+            return client
+
+    @staticmethod
+    async def getMonitorClient() -> AsyncEIBClient:
+        async with AsyncEIBClientFactory.__clientLock:
+            client = AsyncEIBClientFactory.__clientMonitorInstance
+            if client is None or client.getEIBConnection() is None:
+                client = await AsyncEIBClientFactory.__initializeNewClient()
+                AsyncEIBClientFactory.__clientMonitorInstance = client
+            return client
+
+    @staticmethod
+    async def __initializeNewClient():
+        client = AsyncEIBClient()
+        await client.setEIBConnection(EIBClientFactory.findDaemonPort())
+        return client
+
+    @staticmethod
+    def registerListener(listener: EIBClientListener):
+        """
+        registers listener that will be informed of updates for the defined group address
+        needs to be called from within a running event loop
+        updateOccurred of the listener may be a regular method or a coroutine
+        :param listener:    listener instance
+        :type listener:     EIBClientListener
+        """
+        if not listener:
+            return
+
+        _AsyncEIBClientMonitor.register(listener)
+
+    @staticmethod
+    def unregisterListener(listener: EIBClientListener):
+        _AsyncEIBClientMonitor.unregister(listener)
+
+
+class _AsyncEIBClientMonitor(object):
+    """
+    Monitor task permanently watching the group socket and calls the listeners
+    registered for the group address being updated.
+    """
+    __listeners = EIBListenerIndex()
+    __task = None
+
+    @staticmethod
+    async def run():
+        client = await AsyncEIBClientFactory.getMonitorClient()
+        con = client.getEIBConnection()
+        listeners = _AsyncEIBClientMonitor.__listeners
+        try:
+            # register broadcast monitor
+            await con.EIBOpen_GroupSocket(0)
+            while True:
+                telegram = await con.EIBGetGroupTelegram()
+                if telegram is None:
+                    break
+                if not listeners.flags[telegram.dest]:
+                    # no listener registered for the group address
+                    continue
+                for listener in listeners.get(telegram.dest):
+                    try:
+                        result = listener.updateOccurred(telegram.src, listener.decodeValue(telegram.payload))
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception:
+                        # a failing listener must not stop the monitor
+                        _logger.exception("Processing telegram %s failed", telegram)
+        finally:
+            # group socket cannot be reused, next monitor run will open a new connection
+            await client.flush()
+
+    @staticmethod
+    def register(listener):
+        m = _AsyncEIBClientMonitor
+
+        m.__listeners.add(listener)
+
+        # start monitor task once within the running event loop
+        if m.__task is None or m.__task.done():
+            m.__task = asyncio.get_running_loop().create_task(m.run())
+
+    @staticmethod
+    def unregister(listener):
+        m = _AsyncEIBClientMonitor
+        m.__listeners.remove(listener)
+
+        # stop monitoring if last listener removed
+        if len(m.__listeners) == 0 and m.__task is not None:
+            m.__task.cancel()
+            m.__task = None
+
+    @staticmethod
+    def findListener(listener=None, gaddrInt=-1):
+        """
+        Checks index of listeners for existance of corresponding listener identified by instance OR group address
+        :type listener:     EIBClientListener
+        :param gaddrInt:    group address under which listener instance is registered
+        :type gaddrInt:     int
+        :return:            list of one or multiple listeners registered for the same group address, None if not registered for address
+        """
+        ret = None
+        index = _AsyncEIBClientMonitor.__listeners
+        if listener and listener in index:
+            ret = [listener, ]
+        if gaddrInt >= 0 and index.get(gaddrInt):
+            # append matching listener instances
+            ret = (ret or []) + list(index.get(gaddrInt))
+        return ret
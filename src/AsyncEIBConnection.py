@@ -0,0 +1,351 @@
+#
+#   EIBD client library - asyncio variant
+#   Copyright (C) 2005-2011 Martin Koegler <mkoegler@auto.tuwien.ac.at>
+#
+#   Adapted to EIB/KNX client implementation for Python by:
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   In addition to the permissions in the GNU General Public License,
+#   you may link the compiled version of this file into combinations
+#   with other programs, and distribute those combinations without any
+#   restriction coming from the use of this file. (The General Public
+#   License restrictions do apply in other respects; for example, they
+#   cover modification of the file, and distribution when not linked into
+#   a combine executable.)
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import asyncio
+import errno
+
+from EIBConnection import EIBConnection
+
+# maximum number of bytes taken from the stream at once
+_STREAM_READSIZE = 1 << 16
+
+
+class _StreamSocket(object):
+    """
+    Socket replacement handing the data of an asyncio stream to the frame reader of EIBConnection.
+    Sent frames are written to the stream, received data is fed by AsyncEIBConnection.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = bytearray()
+        self.eof = False
+
+    def setblocking(self, flag):
+        pass
+
+    def sendall(self, data):
+        self.writer.write(data)
+
+    def send(self, data):
+        self.writer.write(data)
+        return len(data)
+
+    def recv_into(self, view):
+        if not self.pending:
+            if self.eof:
+                return 0
+            raise BlockingIOError
+        length = min(len(view), len(self.pending))
+        view[:length] = self.pending[:length]
+        del self.pending[:length]
+        return length
+
+    def feed(self, data):
+        if data:
+            self.pending += data
+        else:
+            self.eof = True
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncEIBConnection:
+    """
+    asyncio counterpart of EIBConnection, every request is available as coroutine with the same signature
+    and return values as the blocking variant. Encoding and decoding of the frames is delegated to an
+    EIBConnection instance, only the socket I/O is replaced by asyncio streams.
+    Requests on the same connection are serialized, use one connection per concurrent request stream.
+    """
+
+    def __init__(self):
+        self.__con = EIBConnection()
+        self.__reader = None
+        self.__writer = None
+        self.__lock = asyncio.Lock()
+
+    @property
+    def errno(self):
+        return self.__con.errno
+
+    @property
+    def fd(self):
+        return self.__con.fd
+
+    @property
+    def groupFilter(self):
+        return self.__con.groupFilter
+
+    @groupFilter.setter
+    def groupFilter(self, value):
+        # skipping a telegram inside the completion would read on the non-blocking stream socket until data arrives
+        if value is not None:
+            raise ValueError("Group filter not supported by AsyncEIBConnection, filter the received telegrams instead")
+
+    async def EIBSocketLocal(self, path):
+        if self.__con.fd != None:
+            self.__con.errno = errno.EUSERS
+            return -1
+        reader, writer = await asyncio.open_unix_connection(path)
+        self.__setStream(reader, writer)
+        return 0
+
+    async def EIBSocketRemote(self, host, port=6720):
+        if self.__con.fd != None:
+            self.__con.errno = errno.EUSERS
+            return -1
+        reader, writer = await asyncio.open_connection(host, port)
+        self.__setStream(reader, writer)
+        return 0
+
+    async def EIBSocketURL(self, url):
+        if url[0:6] == 'local:':
+            return await self.EIBSocketLocal(url[6:])
+        if url[0:3] == 'ip:':
+            parts = url.split(':')
+            if (len(parts) == 2):
+                parts.append(6720)
+            return await self.EIBSocketRemote(parts[1], int(parts[2]))
+        self.__con.errno = errno.EINVAL
+        return -1
+
+    def __setStream(self, reader, writer):
+        self.__reader = reader
+        self.__writer = writer
+        self.__con.fd = _StreamSocket(writer)
+
+    async def EIBClose(self):
+        if self.__con.fd == None:
+            self.__con.errno = errno.EINVAL
+            return -1
+        self.__con.EIBClose()
+        try:
+            await self.__writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.__reader = None
+        self.__writer = None
+
+    async def EIBClose_sync(self):
+        await self.EIBReset()
+        return await self.EIBClose()
+
+    async def __EIB_Request(self, request, *args):
+        """
+        sends the request and awaits the response frame without blocking the event loop
+        :param request:     *_async method of the EIBConnection encoding the request
+        :return:            result of the corresponding EIBConnection request
+        """
+        async with self.__lock:
+            if request(*args) == -1:
+                return -1
+            await self.__writer.drain()
+            while True:
+                result = self.__con.EIB_Poll_Complete()
+                if result == -1:
+                    return -1
+                if result == 1:
+                    break
+                self.__con.fd.feed(await self.__reader.read(_STREAM_READSIZE))
+            return self.__con.EIBComplete()
+
+    async def __EIB_Send(self, request, *args):
+        """
+        sends a request not expecting any response
+        """
+        async with self.__lock:
+            result = request(*args)
+            if result != -1:
+                await self.__writer.drain()
+            return result
+
+    async def EIBGetAPDU(self, buf):
+        return await self.__EIB_Request(self.__con.EIBGetAPDU_async, buf)
+
+    async def EIBGetAPDU_Src(self, buf, src):
+        return await self.__EIB_Request(self.__con.EIBGetAPDU_Src_async, buf, src)
+
+    async def EIBGetBusmonitorPacket(self, buf):
+        return await self.__EIB_Request(self.__con.EIBGetBusmonitorPacket_async, buf)
+
+    async def EIBGetGroup_Src(self, buf, src, dest):
+        return await self.__EIB_Request(self.__con.EIBGetGroup_Src_async, buf, src, dest)
+
+    async def EIBGetGroupTelegram(self):
+        result = await self.__EIB_Request(self.__con.EIBGetGroupTelegram_async)
+        return None if result == -1 else result
+
+    async def EIBGetTPDU(self, buf, src):
+        return await self.__EIB_Request(self.__con.EIBGetTPDU_async, buf, src)
+
+    async def EIB_Cache_Clear(self):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Clear_async)
+
+    async def EIB_Cache_Disable(self):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Disable_async)
+
+    async def EIB_Cache_Enable(self):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Enable_async)
+
+    async def EIB_Cache_Read(self, dst, src, buf):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Read_async, dst, src, buf)
+
+    async def EIB_Cache_Read_Sync(self, dst, src, buf, age):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Read_Sync_async, dst, src, buf, age)
+
+    async def EIB_Cache_Remove(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_Cache_Remove_async, dest)
+
+    async def EIB_LoadImage(self, image):
+        return await self.__EIB_Request(self.__con.EIB_LoadImage_async, image)
+
+    async def EIB_MC_Authorize(self, key):
+        return await self.__EIB_Request(self.__con.EIB_MC_Authorize_async, key)
+
+    async def EIB_MC_Connect(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_MC_Connect_async, dest)
+
+    async def EIB_MC_Individual_Open(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_MC_Individual_Open_async, dest)
+
+    async def EIB_MC_GetMaskVersion(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_GetMaskVersion_async)
+
+    async def EIB_MC_GetPEIType(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_GetPEIType_async)
+
+    async def EIB_MC_Progmode_Off(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_Progmode_Off_async)
+
+    async def EIB_MC_Progmode_On(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_Progmode_On_async)
+
+    async def EIB_MC_Progmode_Status(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_Progmode_Status_async)
+
+    async def EIB_MC_Progmode_Toggle(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_Progmode_Toggle_async)
+
+    async def EIB_MC_PropertyDesc(self, obj, propertyno, proptype, max_nr_of_elem, access):
+        return await self.__EIB_Request(self.__con.EIB_MC_PropertyDesc_async, obj, propertyno, proptype, max_nr_of_elem, access)
+
+    async def EIB_MC_PropertyRead(self, obj, propertyno, start, nr_of_elem, buf):
+        return await self.__EIB_Request(self.__con.EIB_MC_PropertyRead_async, obj, propertyno, start, nr_of_elem, buf)
+
+    async def EIB_MC_PropertyScan(self, buf):
+        return await self.__EIB_Request(self.__con.EIB_MC_PropertyScan_async, buf)
+
+    async def EIB_MC_PropertyWrite(self, obj, propertyno, start, nr_of_elem, buf, res):
+        return await self.__EIB_Request(self.__con.EIB_MC_PropertyWrite_async, obj, propertyno, start, nr_of_elem, buf, res)
+
+    async def EIB_MC_ReadADC(self, channel, count, val):
+        return await self.__EIB_Request(self.__con.EIB_MC_ReadADC_async, channel, count, val)
+
+    async def EIB_MC_Read(self, addr, buf_len, buf):
+        return await self.__EIB_Request(self.__con.EIB_MC_Read_async, addr, buf_len, buf)
+
+    async def EIB_MC_Restart(self):
+        return await self.__EIB_Request(self.__con.EIB_MC_Restart_async)
+
+    async def EIB_MC_SetKey(self, key, level):
+        return await self.__EIB_Request(self.__con.EIB_MC_SetKey_async, key, level)
+
+    async def EIB_MC_Write(self, addr, buf):
+        return await self.__EIB_Request(self.__con.EIB_MC_Write_async, addr, buf)
+
+    async def EIB_MC_Write_Plain(self, addr, buf):
+        return await self.__EIB_Request(self.__con.EIB_MC_Write_Plain_async, addr, buf)
+
+    async def EIB_M_GetMaskVersion(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_GetMaskVersion_async, dest)
+
+    async def EIB_M_Progmode_Off(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_Progmode_Off_async, dest)
+
+    async def EIB_M_Progmode_On(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_Progmode_On_async, dest)
+
+    async def EIB_M_Progmode_Status(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_Progmode_Status_async, dest)
+
+    async def EIB_M_Progmode_Toggle(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_Progmode_Toggle_async, dest)
+
+    async def EIB_M_ReadIndividualAddresses(self, buf):
+        return await self.__EIB_Request(self.__con.EIB_M_ReadIndividualAddresses_async, buf)
+
+    async def EIB_M_WriteIndividualAddress(self, dest):
+        return await self.__EIB_Request(self.__con.EIB_M_WriteIndividualAddress_async, dest)
+
+    async def EIBOpenBusmonitor(self):
+        return await self.__EIB_Request(self.__con.EIBOpenBusmonitor_async)
+
+    async def EIBOpenBusmonitorText(self):
+        return await self.__EIB_Request(self.__con.EIBOpenBusmonitorText_async)
+
+    async def EIBOpen_GroupSocket(self, write_only):
+        return await self.__EIB_Request(self.__con.EIBOpen_GroupSocket_async, write_only)
+
+    async def EIBOpenT_Broadcast(self, write_only):
+        return await self.__EIB_Request(self.__con.EIBOpenT_Broadcast_async, write_only)
+
+    async def EIBOpenT_Connection(self, dest):
+        return await self.__EIB_Request(self.__con.EIBOpenT_Connection_async, dest)
+
+    async def EIBOpenT_Group(self, dest, write_only):
+        return await self.__EIB_Request(self.__con.EIBOpenT_Group_async, dest, write_only)
+
+    async def EIBOpenT_Individual(self, dest, write_only):
+        return await self.__EIB_Request(self.__con.EIBOpenT_Individual_async, dest, write_only)
+
+    async def EIBOpenT_TPDU(self, src):
+        return await self.__EIB_Request(self.__con.EIBOpenT_TPDU_async, src)
+
+    async def EIBOpenVBusmonitor(self):
+        return await self.__EIB_Request(self.__con.EIBOpenVBusmonitor_async)
+
+    async def EIBOpenVBusmonitorText(self):
+        return await self.__EIB_Request(self.__con.EIBOpenVBusmonitorText_async)
+
+    async def EIBReset(self):
+        return await self.__EIB_Request(self.__con.EIBReset_async)
+
+    async def EIBSendAPDU(self, data):
+        return await self.__EIB_Send(self.__con.EIBSendAPDU, data)
+
+    async def EIBSendGroup(self, dest, data):
+        return await self.__EIB_Send(self.__con.EIBSendGroup, dest, data)
+
+    async def EIBSendGroup_Many(self, dests, datas):
+        return await self.__EIB_Send(self.__con.EIBSendGroup_Many, dests, datas)
+
+    async def EIBSendTPDU(self, dest, data):
+        return await self.__EIB_Send(self.__con.EIBSendTPDU, dest, data)
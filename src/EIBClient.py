@@ -21,15 +21,36 @@
 
 from __future__ import print_function
 
+import collections
+import errno
+import logging
+import math
 import os
+import random
+import socket
 import threading
+import time
+from contextlib import contextmanager
 
 from common import *
 from EIBConnection import EIBConnection, EIBAddr, EIBBuffer
+from EIBDispatcher import EIBBatcher, EIBDispatcher
+from EIBMetrics import EIBMetrics
+from dpt import getCodec
+from EIBGroupCache import EIBGroupCache
+from EIBGroupHistory import EIBGroupHistory
+from EIBRecorder import EIBRecorder
+from EIBRoutingTable import EIBRoutingTable
+
+_logger = logging.getLogger(__name__)
 
 
 class EIBClientListener(object):
     __gaddrInt = 0
+    __gaddrs = range(0)
+    __batchSize = 0
+    __batchLatency = 0.1
+    __dpt = None
 
     """
     Abstract Listener implementation
@@ -37,26 +58,152 @@ class EIBClientListener(object):
     and register via the EIBClientFactory
     """
 
-    def __init__(self, gaddr):
+    def __init__(self, gaddr, batchSize=0, batchLatency=0.1, dpt=None):
         """
         initialize a new listener class, events will be reported via updateOccured method
-        :param gaddr: KNX string representation of group address to be listened to ("1/0/3")
+        :param gaddr:           KNX string representation of group address to be listened to ("1/0/3"),
+                                main or middle group wildcard ("1/*/*", "1/2/*"), range ("1/0/0-1/0/255")
+                                or a list or set of those
+        :param batchSize:       maximum number of updates reported at once via updateOccurredBatch,
+                                0 to report every update separately via updateOccurred
+        :param batchLatency:    maximum seconds an update is held back to be reported within a batch
+        :param dpt:             datapoint type ("9.001") to receive decoded native values,
+                                None to receive the raw APDU as list of int
         """
-        self.__gaddrInt = readgaddr(gaddr)
+        self.__dpt = getCodec(dpt) if dpt is not None else None
+        self.__batchSize = batchSize
+        self.__batchLatency = batchLatency
+        self.__gaddrs = readgaddrset(gaddr)
+        self.__gaddrText = gaddr if isinstance(gaddr, str) else ", ".join(gaddr)
+        # single group address for exact listeners, -1 if listening to multiple group addresses
+        self.__gaddrInt = next(iter(self.__gaddrs)) if len(self.__gaddrs) == 1 else -1
 
     @property
     def gaddrInt(self) -> int:
         return self.__gaddrInt
 
+    @property
+    def gaddrs(self):
+        """
+        all group addresses listened to as range or frozenset of int
+        """
+        return self.__gaddrs
+
     def getGoupAddressText(self) -> str:
-        return printGroup(self.__gaddrInt)
+        if self.__gaddrInt >= 0:
+            return printGroup(self.__gaddrInt)
+        return self.__gaddrText
+
+    @property
+    def batchSize(self) -> int:
+        return self.__batchSize
+
+    @property
+    def batchLatency(self) -> float:
+        return self.__batchLatency
+
+    @property
+    def dpt(self):
+        return self.__dpt
+
+    def decodeValue(self, raw):
+        """
+        converts the APDU of a received telegram into the value reported to updateOccurred
+        :param raw: APDU including TPCI/APCI as bytes
+        :return:    native value if a datapoint type is set, otherwise the APDU as list of int
+        """
+        if self.__dpt is None:
+            return list(raw)
+        return decodeDPT(self.__dpt, raw)
 
     def updateOccurred(self, srcAddr, val):
         raise NotImplementedError
 
+    def updateOccurredBatch(self, updates):
+        """
+        reports multiple updates at once if listener has been initialized with batchSize > 0
+        default implementation reports each update via updateOccurred
+        :param updates: list of tuples (srcAddr, destAddr, val, timestamp) in order of reception
+        """
+        for srcAddr, destAddr, val, timestamp in updates:
+            self.updateOccurred(srcAddr, val)
+
+
+class EIBListenerIndex(object):
+    """
+    Index of listeners by group address
+    Wildcard and range listeners are resolved into the index on registration, so finding the listeners
+    of a group address is a single lookup independent of the number and kind of registered listeners.
+    Lookups do not lock, the listener tuples are replaced on update instead of being modified.
+    """
+
+    def __init__(self):
+        # group address -> tuple of listeners
+        self.__index = {}
+        self.__listeners = set()
+        self.__lock = threading.Lock()
+        # one flag per group address having listeners, lets the connection drop other telegrams before decoding them
+        self.flags = bytearray(0x10000)
+
+    def __len__(self):
+        return len(self.__listeners)
+
+    def __contains__(self, listener):
+        return listener in self.__listeners
+
+    def __iter__(self):
+        with self.__lock:
+            return iter(tuple(self.__listeners))
+
+    def get(self, gaddrInt) -> tuple:
+        """
+        :return:    tuple of listeners registered for the group address, empty if none
+        """
+        return self.__index.get(gaddrInt, ())
+
+    def add(self, listener) -> bool:
+        """
+        :return:    False if listener has already been added
+        """
+        with self.__lock:
+            if listener in self.__listeners:
+                return False
+            self.__listeners.add(listener)
+            self.__update(listener.gaddrs, lambda listeners: listeners + (listener,))
+            return True
+
+    def remove(self, listener):
+        """
+        :raises:    ValueError if listener is not registered
+        """
+        with self.__lock:
+            if listener not in self.__listeners:
+                raise ValueError("Listener not registered")
+            self.__listeners.remove(listener)
+            self.__update(listener.gaddrs, lambda listeners: tuple(rl for rl in listeners if rl is not listener))
+
+    def __update(self, gaddrs, change):
+        # addresses sharing the same listeners before the update share the changed tuple as well
+        changed = {}
+        for gaddrInt in gaddrs:
+            listeners = self.__index.get(gaddrInt, ())
+            entry = changed.get(id(listeners))
+            if entry is None:
+                # keep the former tuple referenced, its id must not be reused during the update
+                entry = changed[id(listeners)] = (listeners, change(listeners))
+            if entry[1]:
+                self.__index[gaddrInt] = entry[1]
+                self.flags[gaddrInt] = 1
+            else:
+                self.__index.pop(gaddrInt, None)
+                self.flags[gaddrInt] = 0
+
 
 class EIBClient(object):
     __EIBConnection = None
+    __EIBPort = None
+    # separate connection in group socket mode used for writing group values
+    __groupSocket = None
 
     def flush(self):
         """
@@ -65,14 +212,32 @@ class EIBClient(object):
         # close socket connection
         if self.__EIBConnection and self.__EIBConnection.fd:
             self.__EIBConnection.fd.close()
+        if self.__groupSocket and self.__groupSocket.fd:
+            self.__groupSocket.fd.close()
+        self.__groupSocket = None
 
     def getEIBConnection(self):
         return self.__EIBConnection
 
+    def getEIBPort(self) -> str:
+        """
+        :return:    socket path or host[:port] of the daemon passed to setEIBConnection
+        """
+        return self.__EIBPort
+
     def setEIBConnection(self, port):
         """
         Establishes the socket connection
         """
+        self.__EIBConnection = EIBClient.createConnection(port)
+        self.__EIBPort = port
+
+    @staticmethod
+    def createConnection(port) -> EIBConnection:
+        """
+        :param port:    socket path or host[:port] of the daemon
+        :return:        established connection
+        """
         c = EIBConnection()
         if port[0] == '/':
             c.EIBSocketLocal(port)
@@ -81,18 +246,39 @@ class EIBClient(object):
             if len(parts) == 1:
                 parts.append(6720)
             c.EIBSocketRemote(parts[0], int(parts[1]))
+        return c
 
-        self.__EIBConnection = c
-
-    def GroupCache_Read(self, addrSrc):
+    def GroupCache_Read(self, addrSrc, age=None, dpt=None):
         """
         reads value from local cache
         :param addrSrc: KNX address with "/" separator
+        :param age:     maximum age of the value in seconds, None to accept any cached value
+        :param dpt:     datapoint type ("9.001") to return the decoded native value, None for hex string
         :return: current value in cache
         """
         raise NotImplementedError
 
-    def Group_Write_DPTVal(self, addrDest, val):
+    def GroupCache_ReadMany(self, addrSrcs, age=None, dpt=None):
+        """
+        reads values of multiple group addresses from local cache
+        :param addrSrcs:    list of KNX addresses with "/" separator
+        :param age:         maximum age of the cached values in seconds, None to accept any cached value
+        :param dpt:         datapoint type for all addresses or dict of address to datapoint type,
+                            None for hex strings
+        :return:            1. value: dict of address to current value in cache, 2. value: dict of address to error
+        """
+        raise NotImplementedError
+
+    def Group_Write_DPTVal(self, addrDest, val, dpt=None):
+        raise NotImplementedError
+
+    def Group_Write_Many(self, writes):
+        """
+        writes values to multiple group addresses at once
+        :param writes:  list of tuples (KNX address with "/" separator, value) resp.
+                        (KNX address with "/" separator, native value, datapoint type)
+        :return:        1. value: list of addresses written, 2. value: dict of address to error message
+        """
         raise NotImplementedError
 
 
@@ -102,50 +288,438 @@ class _EIBClient(EIBClient):
     This class mimics the behavior of knxdtool implementation
     """
 
-    def GroupCache_Read(self, addrSrc):
+    def __init__(self):
+        self.__groupSocketLock = threading.Lock()
+
+    def GroupCache_Read(self, addrSrc, age=None, dpt=None):
         """
         reads value from local cache
+        if the client side value cache is enabled and holds a value not older than age, the daemon is not requested
         :param      addrSrc: KNX address with "/" separator
-        :return:    string representation of hexified value in cache
+        :param      age: maximum age of the value in seconds, knxd reads the value from the bus if older,
+                    fractions are rounded up to the whole seconds knxd supports, None to accept any cached value
+        :param      dpt: datapoint type ("9.001") to return the decoded native value
+        :return:    native value if dpt is given, otherwise string representation of hexified value in cache
         :raises:    ValueError
         """
+        gaddrInt = readgaddr(addrSrc)
+        cache = EIBClientFactory.getValueCache()
+        if cache is not None:
+            entry = cache.get(gaddrInt, age)
+            if entry is not None:
+                return convertValue(entry.raw, dpt)
+
         buf = EIBBuffer()
         src = EIBAddr()
 
         # call group cache
-        rlen = self.__EIBConnection.EIB_Cache_Read(readgaddr(addrSrc),
-                                                   src,
-                                                   buf)
+        if age is None:
+            rlen = self.__EIBConnection.EIB_Cache_Read(gaddrInt,
+                                                       src,
+                                                       buf)
+        else:
+            rlen = self.__EIBConnection.EIB_Cache_Read_Sync(gaddrInt,
+                                                            src,
+                                                            buf,
+                                                            math.ceil(age))
 
         if rlen == -1:
             raise ValueError("Read failed - " + os.strerror(self.__EIBConnection.errno))
-        elif len(buf.buffer) < 2:
+        elif len(buf.raw) < 2:
             raise ValueError("Buffer size too small - {0}: {1}".format(addrSrc,
-                                                                       buf.buffer))
+                                                                       buf.raw))
 
-        return printValue(buf.buffer, rlen)
+        if cache is not None:
+            cache.update(gaddrInt, src.data, buf.raw, self.__daemonValueTime(age))
+        return convertValue(buf.raw, dpt)
 
-    def Group_Write_DPTVal(self, addrDest, val):
-        vals = re.compile(r"[ \t]").split(val)
+    @staticmethod
+    def __daemonValueTime(age):
+        """
+        reception time of a value read from the daemon is unknown, it is at most age seconds old
+        """
+        return time.time() - age if age is not None else 0
 
-        lbuf = [0x0] * (len(vals) + 2)
-        # init buffer lbuf[0] = 0x0, lbuf[1] = 0x80
-        lbuf[1] = 0x80
+    def GroupCache_ReadMany(self, addrSrcs, age=None, dpt=None):
+        """
+        reads values of multiple group addresses from local cache with pipelined requests
+        all requests are sent before the first response is awaited, saving one round trip per address
+        :param      addrSrcs: list of KNX addresses with "/" separator
+        :param      age: maximum age of the cached values in seconds, knxd reads the value from the bus if older,
+                    fractions are rounded up to the whole seconds knxd supports, None to accept any cached value
+        :param      dpt: datapoint type for all addresses or dict of address to datapoint type to return
+                    decoded native values, addresses without datapoint type are returned as hex string
+        :return:    1. value: dict of address to native value resp. string representation of hexified value,
+                    2. value: dict of address to error message for addresses that could not be read
+        :raises:    ValueError for invalid addresses
+        """
+        values = {}
+        errors = {}
+        gaddrInts = [readgaddr(a) for a in addrSrcs]
+        dpts = dpt if isinstance(dpt, dict) else None
 
-        lbuf, length = readBlock(lbuf, vals)
-        if length < 0:
-            raise ValueError("Invalid hex bytes")
+        # answer from client side value cache where possible, request the remaining addresses from the daemon
+        cache = EIBClientFactory.getValueCache()
+        if cache is not None:
+            missing = []
+            for addrSrc, gaddrInt in zip(addrSrcs, gaddrInts):
+                entry = cache.get(gaddrInt, age)
+                if entry is not None:
+                    values[addrSrc] = convertValue(entry.raw, dpts.get(addrSrc) if dpts else dpt)
+                else:
+                    missing.append((addrSrc, gaddrInt))
+            addrSrcs = [m[0] for m in missing]
+            gaddrInts = [m[1] for m in missing]
 
-        if self.__EIBConnection.EIBOpenT_Group(readgaddr(addrDest), 1) == -1:
-            raise ConnectionError("Connect failed")
+        bufs = [EIBBuffer() for _ in addrSrcs]
+        srcs = [EIBAddr() for _ in addrSrcs]
+        results = self.__EIBConnection.EIB_Cache_Read_Many(gaddrInts,
+                                                           srcs,
+                                                           bufs,
+                                                           math.ceil(age) if age is not None else None)
 
-        length = self.__EIBConnection.EIBSendAPDU(lbuf)
-        if length == -1:
-            raise ConnectionError("Send request failed")
+        for addrSrc, gaddrInt, src, buf, (rlen, err) in zip(addrSrcs, gaddrInts, srcs, bufs, results):
+            if rlen == -1:
+                errors[addrSrc] = "Read failed - " + os.strerror(err)
+            elif len(buf.raw) < 2:
+                errors[addrSrc] = "Buffer size too small - {0}".format(buf.raw)
+            else:
+                try:
+                    values[addrSrc] = convertValue(buf.raw, dpts.get(addrSrc) if dpts else dpt)
+                except ValueError as e:
+                    errors[addrSrc] = str(e)
+                if cache is not None:
+                    cache.update(gaddrInt, src.data, buf.raw, self.__daemonValueTime(age))
+        return values, errors
+
+    def Group_Write_DPTVal(self, addrDest, val, dpt=None):
+        """
+        writes a value to a group address via the persistent group socket
+        :param addrDest:    KNX address with "/" separator
+        :param val:         native value if dpt is given, otherwise value as hex string "44 B1 00 01"
+        :param dpt:         datapoint type ("9.001") of the native value
+        :return:            1 on success
+        :raises:            ValueError for invalid values, ConnectionError if sending failed
+        """
+        lbuf = readValue(val, dpt)
+
+        with self.__groupSocketLock:
+            con = self.__getGroupSocket()
+            try:
+                length = con.EIBSendGroup(readgaddr(addrDest), lbuf)
+            except OSError as e:
+                # drop broken connection, next write reconnects
+                self.__closeGroupSocket()
+                raise ConnectionError("Send request failed - " + str(e))
+            if length == -1:
+                self.__closeGroupSocket()
+                raise ConnectionError("Send request failed")
 
         # report success
         return 1
 
+    def Group_Write_Many(self, writes):
+        """
+        writes values to multiple group addresses, e.g. for scenes
+        all telegrams are encoded up front and sent with a single write on the group socket
+        :param writes:  list of tuples (KNX address with "/" separator, value as hex string "44 B1 00 01")
+                        resp. (KNX address with "/" separator, native value, datapoint type "9.001")
+        :return:        1. value: list of addresses written, 2. value: dict of address to error message
+        :raises:        ConnectionError if the group socket cannot be opened
+        """
+        errors = {}
+        addrDests = []
+        dests = []
+        apdus = []
+        for write in writes:
+            addrDest = write[0]
+            try:
+                dest = readgaddr(addrDest)
+                apdu = readValue(write[1], write[2] if len(write) > 2 else None)
+            except ValueError as e:
+                errors[addrDest] = str(e)
+                continue
+            dests.append(dest)
+            apdus.append(apdu)
+            addrDests.append(addrDest)
+
+        with self.__groupSocketLock:
+            results = self.__getGroupSocket().EIBSendGroup_Many(dests, apdus)
+            if any(result == -1 and err != errno.EINVAL for result, err in results):
+                # drop broken connection, next write reconnects
+                self.__closeGroupSocket()
+
+        written = []
+        for addrDest, (result, err) in zip(addrDests, results):
+            if result == -1:
+                errors[addrDest] = "Send request failed - " + os.strerror(err)
+            else:
+                written.append(addrDest)
+        return written, errors
+
+    def __getGroupSocket(self) -> EIBConnection:
+        """
+        group socket is opened on first write and kept for all further writes to any group address
+        """
+        if self.__groupSocket is None:
+            con = EIBClient.createConnection(self.__EIBPort)
+            if con.EIBOpen_GroupSocket(1) == -1:
+                con.EIBClose()
+                raise ConnectionError("Connect failed")
+            self.__groupSocket = con
+        return self.__groupSocket
+
+    def __closeGroupSocket(self):
+        if self.__groupSocket is not None and self.__groupSocket.fd:
+            self.__groupSocket.EIBClose()
+        self.__groupSocket = None
+
+
+class EIBClientPool(object):
+    """
+    Thread-safe pool of EIB/KNX clients, each of them owning a separate connection to the daemon
+    Clients are checked out for exclusive use and returned afterwards, so no connection is used by another thread
+    while a request is in progress. Connections are established on demand up to maxSize and closed after being
+    idle for more than idleTimeout seconds.
+    """
+
+    def __init__(self, port, maxSize=4, idleTimeout=60.0):
+        """
+        :param port:        socket path or host[:port] of the daemon
+        :param maxSize:     maximum number of concurrent connections
+        :param idleTimeout: seconds after which an unused connection is closed
+        """
+        if maxSize < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.__port = port
+        self.__maxSize = maxSize
+        self.__idleTimeout = idleTimeout
+        # idle clients with time of return, most recently used at the right
+        self.__idle = collections.deque()
+        self.__size = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """
+        number of open connections, either idle or checked out
+        """
+        return self.__size
+
+    @property
+    def idleCount(self) -> int:
+        return len(self.__idle)
+
+    def checkout(self, timeout=None) -> EIBClient:
+        """
+        takes a client from the pool for exclusive use, needs to be returned via checkin
+        :param timeout:     seconds to wait for a client if maxSize connections are in use, None to wait forever
+        :return:            client with an established connection
+        :raises:            TimeoutError if no client became available in time
+        """
+        with self.__condition:
+            if self.__closed:
+                raise ConnectionError("Pool closed")
+            self.__evictIdle()
+            if not self.__condition.wait_for(lambda: self.__idle or self.__size < self.__maxSize, timeout):
+                raise TimeoutError("No connection available within {0}s".format(timeout))
+            if self.__idle:
+                client = self.__idle.pop()[0]
+                client.getEIBConnection().errno = 0
+                return client
+            # reserve slot, connection is established outside the lock
+            self.__size += 1
+
+        try:
+            client = _EIBClient()
+            client.setEIBConnection(self.__port)
+        except BaseException:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+        return client
+
+    def checkin(self, client, discard=False):
+        """
+        returns a client to the pool
+        :param client:      client taken via checkout
+        :param discard:     closes the connection instead of keeping it for reuse, e.g. after connection errors
+        """
+        with self.__condition:
+            if discard or self.__closed:
+                self.__size -= 1
+                client.flush()
+            else:
+                self.__idle.append((client, time.monotonic()))
+            self.__condition.notify()
+
+    @contextmanager
+    def client(self, timeout=None):
+        """
+        context manager for checkout and checkin of a client
+        connection is discarded if the request failed due to a broken connection
+        """
+        client = self.checkout(timeout)
+        try:
+            yield client
+        except Exception as e:
+            broken = not isinstance(e, ValueError) or client.getEIBConnection().errno == errno.ECONNRESET
+            self.checkin(client, discard=broken)
+            raise
+        self.checkin(client)
+
+    def evictIdle(self):
+        """
+        closes all connections being idle for more than idleTimeout seconds
+        """
+        with self.__condition:
+            self.__evictIdle()
+
+    def __evictIdle(self):
+        limit = time.monotonic() - self.__idleTimeout
+        while self.__idle and self.__idle[0][1] < limit:
+            self.__idle.popleft()[0].flush()
+            self.__size -= 1
+
+    def close(self):
+        """
+        closes all idle connections, clients still checked out are closed when returned
+        """
+        with self.__condition:
+            self.__closed = True
+            while self.__idle:
+                self.__idle.popleft()[0].flush()
+                self.__size -= 1
+            self.__condition.notify_all()
+
+
+class _EIBPooledClient(EIBClient):
+    """
+    EIB/KNX client distributing the requests of concurrent threads on the connections of an EIBClientPool
+    """
+
+    def __init__(self, pool: EIBClientPool):
+        self.__pool = pool
+
+    def getPool(self) -> EIBClientPool:
+        return self.__pool
+
+    def flush(self):
+        """
+        closes all connections of the pool
+        """
+        self.__pool.close()
+
+    def GroupCache_Read(self, addrSrc, age=None, dpt=None):
+        with self.__pool.client() as client:
+            return client.GroupCache_Read(addrSrc, age, dpt)
+
+    def GroupCache_ReadMany(self, addrSrcs, age=None, dpt=None):
+        with self.__pool.client() as client:
+            return client.GroupCache_ReadMany(addrSrcs, age, dpt)
+
+    def Group_Write_DPTVal(self, addrDest, val, dpt=None):
+        with self.__pool.client() as client:
+            return client.Group_Write_DPTVal(addrDest, val, dpt)
+
+    def Group_Write_Many(self, writes):
+        with self.__pool.client() as client:
+            return client.Group_Write_Many(writes)
+
+
+class _EIBRoutedClient(EIBClient):
+    """
+    EIB/KNX client sending each request to the daemon the group address is routed to
+    A client per daemon is created on its first request.
+    """
+
+    def __init__(self, routing: EIBRoutingTable, createClient):
+        """
+        :param routing:         routing table of group addresses to daemons
+        :param createClient:    function returning a client for a port
+        """
+        self.__routing = routing
+        self.__createClient = createClient
+        self.__clients = {}
+        self.__lock = threading.Lock()
+
+    def getRouting(self) -> EIBRoutingTable:
+        return self.__routing
+
+    def getClientFor(self, addr) -> EIBClient:
+        """
+        :param addr:    KNX address with "/" separator
+        :return:        client of the daemon serving the group address
+        :raises:        ValueError if the group address is not routed
+        """
+        port = self.__routing.route(readgaddr(addr))
+        client = self.__clients.get(port)
+        if client is None:
+            with self.__lock:
+                client = self.__clients.get(port)
+                if client is None:
+                    client = self.__clients[port] = self.__createClient(port)
+        return client
+
+    def __partition(self, items, errors):
+        """
+        groups items by the client of their group address, the address is the first element of each item
+        items of unrouted group addresses are reported in errors
+        :return:    list of tuples (client, items)
+        """
+        partitions = collections.OrderedDict()
+        for item in items:
+            addr = item[0] if isinstance(item, tuple) else item
+            try:
+                client = self.getClientFor(addr)
+            except ValueError as e:
+                errors[addr] = str(e)
+                continue
+            partitions.setdefault(client, []).append(item)
+        return list(partitions.items())
+
+    def flush(self):
+        """
+        closes the connections to all daemons
+        """
+        with self.__lock:
+            clients = list(self.__clients.values())
+            self.__clients = {}
+        for client in clients:
+            client.flush()
+
+    def GroupCache_Read(self, addrSrc, age=None, dpt=None):
+        return self.getClientFor(addrSrc).GroupCache_Read(addrSrc, age, dpt)
+
+    def GroupCache_ReadMany(self, addrSrcs, age=None, dpt=None):
+        """
+        reads the addresses of each daemon with pipelined requests, see _EIBClient.GroupCache_ReadMany
+        """
+        values = {}
+        errors = {}
+        for client, addrs in self.__partition(addrSrcs, errors):
+            v, e = client.GroupCache_ReadMany(addrs, age, dpt)
+            values.update(v)
+            errors.update(e)
+        return values, errors
+
+    def Group_Write_DPTVal(self, addrDest, val, dpt=None):
+        return self.getClientFor(addrDest).Group_Write_DPTVal(addrDest, val, dpt)
+
+    def Group_Write_Many(self, writes):
+        """
+        writes to each daemon with a single send, order of writes is kept per daemon
+        """
+        written = []
+        errors = {}
+        for client, items in self.__partition(writes, errors):
+            w, e = client.Group_Write_Many(items)
+            written += w
+            errors.update(e)
+        return written, errors
+
 
 class EIBClientFactory(object):
     """
@@ -155,6 +729,13 @@ class EIBClientFactory(object):
     __factoryInstance = None
     __clientInstance = None
     __clientMonitorInstance = None
+    __pooledClientInstance = None
+    __poolLock = threading.Lock()
+    # optional routing of group addresses to multiple daemons
+    __routing = None
+    __valueCache = None
+    __history = None
+    __recorder = None
 
     def __new__(cls, *args, **kwargs):
         """
@@ -177,18 +758,70 @@ class EIBClientFactory(object):
             EIBClientFactory.__clientMonitorInstance = EIBClientFactory.__initializeNewClient()
         return EIBClientFactory.__clientMonitorInstance
 
+    @staticmethod
+    def getPooledClient(maxSize=4, idleTimeout=60.0) -> EIBClient:
+        """
+        client for concurrent use by multiple threads, requests are distributed on a pool of connections
+        :param maxSize:     maximum number of connections, only considered when the pool is created
+        :param idleTimeout: seconds after which an unused connection is closed, only considered when the pool is created
+        """
+        with EIBClientFactory.__poolLock:
+            if EIBClientFactory.__pooledClientInstance is None:
+                routing = EIBClientFactory.__routing
+                if routing is not None:
+                    client = _EIBRoutedClient(routing,
+                                              lambda port: _EIBPooledClient(EIBClientPool(port, maxSize, idleTimeout)))
+                else:
+                    client = _EIBPooledClient(EIBClientPool(EIBClientFactory.findDaemonPort(), maxSize, idleTimeout))
+                EIBClientFactory.__pooledClientInstance = client
+        return EIBClientFactory.__pooledClientInstance
+
     @staticmethod
     def __initializeNewClient():
+        if EIBClientFactory.__routing is not None:
+            return _EIBRoutedClient(EIBClientFactory.__routing, EIBClientFactory.__connectClient)
+        return EIBClientFactory.__connectClient(EIBClientFactory.findDaemonPort())
+
+    @staticmethod
+    def __connectClient(port):
         client = _EIBClient()
-        # find KNX/EIB daemon - for now only local instances
+        client.setEIBConnection(port)
+        return client
+
+    @staticmethod
+    def setRouting(routing):
+        """
+        sends requests and listener registrations to the daemon serving the group address, e.g. one per line
+        clients created before are flushed and replaced on their next use,
+        the bus monitor applies the routing when it is started
+        :param routing: EIBRoutingTable, None for a single daemon found by findDaemonPort
+        """
+        with EIBClientFactory.__poolLock:
+            EIBClientFactory.__routing = routing
+            clients = (EIBClientFactory.__clientInstance, EIBClientFactory.__pooledClientInstance)
+            EIBClientFactory.__clientInstance = None
+            EIBClientFactory.__pooledClientInstance = None
+        for client in clients:
+            if client is not None:
+                client.flush()
+
+    @staticmethod
+    def getRouting() -> EIBRoutingTable:
+        return EIBClientFactory.__routing
+
+    @staticmethod
+    def findDaemonPort() -> str:
+        """
+        find KNX/EIB daemon - for now only local instances
+        :return:    socket path or host name of the daemon
+        """
         if os.path.exists('/run/knx'):
             port = '/run/knx'
         elif os.path.exists('/tmp/eib'):
             port = '/tmp/eib'
         else:
             port = 'localhost'
-        client.setEIBConnection(port)
-        return client
+        return port
 
     @staticmethod
     def registerListener(listener: EIBClientListener):
@@ -206,6 +839,116 @@ class EIBClientFactory(object):
     def unregisterListener(listener: EIBClientListener):
         _EIBClientMonitor.unregister(listener)
 
+    @staticmethod
+    def enableValueCache(maxSize=10000) -> EIBGroupCache:
+        """
+        keeps the latest value per group address seen by the bus monitor within the client process
+        GroupCache_Read is answered from it if the value is fresh enough, the bus monitor is started if not yet running
+        :param maxSize: maximum number of group addresses kept, least recently used ones are evicted first
+        :return:        cache providing hit/miss statistics
+        """
+        cache = EIBGroupCache(maxSize)
+        EIBClientFactory.__valueCache = cache
+        _EIBClientMonitor.setValueCache(cache)
+        _EIBClientMonitor.startMonitor()
+        return cache
+
+    @staticmethod
+    def disableValueCache():
+        EIBClientFactory.__valueCache = None
+        _EIBClientMonitor.setValueCache(None)
+
+    @staticmethod
+    def getValueCache() -> EIBGroupCache:
+        """
+        :return:    client side value cache, None if not enabled
+        """
+        return EIBClientFactory.__valueCache
+
+    @staticmethod
+    def enableHistory(depth=64, maxAddresses=5000) -> EIBGroupHistory:
+        """
+        keeps the last values per group address seen by the bus monitor, e.g. for trends or debouncing
+        the bus monitor is started if not yet running
+        :param depth:           number of values kept per group address
+        :param maxAddresses:    maximum number of group addresses kept, least recently updated ones are evicted first
+        :return:                history providing last/since queries
+        """
+        history = EIBGroupHistory(depth, maxAddresses)
+        EIBClientFactory.__history = history
+        _EIBClientMonitor.setHistory(history)
+        _EIBClientMonitor.startMonitor()
+        return history
+
+    @staticmethod
+    def disableHistory():
+        EIBClientFactory.__history = None
+        _EIBClientMonitor.setHistory(None)
+
+    @staticmethod
+    def getHistory() -> EIBGroupHistory:
+        """
+        :return:    value history, None if not enabled
+        """
+        return EIBClientFactory.__history
+
+    @staticmethod
+    def startRecording(path, flushInterval=1.0) -> EIBRecorder:
+        """
+        records all telegrams seen by the bus monitor to a binary file, readable via EIBRecordReader
+        the bus monitor is started if not yet running
+        :param path:            data file, appended to if existing
+        :param flushInterval:   maximum seconds telegrams are buffered before being written and synced
+        :return:                recorder
+        """
+        EIBClientFactory.stopRecording()
+        recorder = EIBRecorder(path, flushInterval)
+        EIBClientFactory.__recorder = recorder
+        _EIBClientMonitor.setRecorder(recorder)
+        _EIBClientMonitor.startMonitor()
+        return recorder
+
+    @staticmethod
+    def stopRecording():
+        recorder = EIBClientFactory.__recorder
+        EIBClientFactory.__recorder = None
+        _EIBClientMonitor.setRecorder(None)
+        if recorder is not None:
+            recorder.close()
+
+    @staticmethod
+    def configureDispatch(workers=4, maxQueueSize=10000, block=False) -> EIBDispatcher:
+        """
+        calls the listeners from a pool of worker threads, so slow listeners do not stall the bus monitor
+        updates of a group address are still delivered in order
+        :param workers:         number of worker threads, 0 to call the listeners from the monitor thread
+        :param maxQueueSize:    maximum number of queued telegrams per worker
+        :param block:           stall the monitor instead of dropping telegrams if a queue is full
+        :return:                dispatcher providing queue depth and overflow statistics, None if workers is 0
+        """
+        dispatcher = EIBDispatcher(workers, maxQueueSize, block) if workers > 0 else None
+        _EIBClientMonitor.setDispatcher(dispatcher)
+        return dispatcher
+
+    @staticmethod
+    def configureReconnect(minDelay=0.5, maxDelay=30.0):
+        """
+        delays of the bus monitor between reconnect attempts after the connection to a daemon failed
+        the delay starts at minDelay and is doubled after each failed attempt up to maxDelay
+        :param minDelay:    seconds before the first attempt
+        :param maxDelay:    maximum seconds between two attempts
+        """
+        if not 0 < minDelay <= maxDelay:
+            raise ValueError("Invalid reconnect delays - {0}, {1}".format(minDelay, maxDelay))
+        _EIBClientMonitor.setReconnectDelay(minDelay, maxDelay)
+
+    @staticmethod
+    def stopMonitor(timeout=None):
+        """
+        stops the bus monitor, registered listeners are kept and informed again once the monitor is restarted
+        """
+        _EIBClientMonitor.stopMonitor(timeout)
+
 
 class _EIBClientMonitor(threading.Thread):
     """
@@ -213,7 +956,26 @@ class _EIBClientMonitor(threading.Thread):
     if listener is registered for a dedicated group address being updated.
     """
     __instance = None
-    __listenerList = []
+    __listeners = EIBListenerIndex()
+    # optional dispatch stage, listeners are called by the monitor thread if not set
+    __dispatcher = None
+    __batcher = EIBBatcher()
+    # optional client side value cache updated by every telegram
+    __valueCache = None
+    # optional value history updated by every telegram
+    __history = None
+    # optional recorder writing every telegram to disk
+    __recorder = None
+    # daemon port -> group socket currently connected, replaced on start
+    __connections = {}
+    # set to stop the threads of the running monitor, replaced on start
+    __stopping = threading.Event()
+    # stop event and connections of this monitor, threads of a stopped monitor may still be running
+    __generation = None
+    # seconds between reconnect attempts, doubled after each failed attempt
+    __reconnectDelay = (0.5, 30.0)
+    __initialized = False
+    __startLock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
         """
@@ -223,81 +985,350 @@ class _EIBClientMonitor(threading.Thread):
             _EIBClientMonitor.__instance = object.__new__(cls)
         return _EIBClientMonitor.__instance
 
+    def __init__(self):
+        # singleton, thread state must only be initialized once
+        if self.__initialized:
+            return
+        super().__init__(name="EIBClientMonitor")
+        self.__initialized = True
+
     def run(self):
-        con = EIBClientFactory.getMonitorClient().getEIBConnection()
-        # register broadcast monitor
-        con.EIBOpen_GroupSocket(0)
-        buf = EIBBuffer()
-        src = EIBAddr()
-        dest = EIBAddr()
-        while con.EIBGetGroup_Src(buf, src, dest):
-            listener = self.findListener(gaddrInt=dest.data)
-            # only for debug
-            # print("%s(%s) > %s(%s): %s" % (printGroup(src.data), src.data,
-            #                                printGroup(dest.data), dest.data,
-            #                                repr(buf.buffer)))
-            # continue in case no listener registered for destination
-            if listener is None:
-                continue
-            # check whether multiple listeners for destination exists
-            if listener and isinstance(listener, list):
-                for rl in listener:
-                    self.__informListener(rl, buf, dest, src)
+        stopping, connections = self.__generation
+        routing = EIBClientFactory.getRouting()
+        if routing is None:
+            try:
+                client = EIBClientFactory.getMonitorClient()
+                con = client.getEIBConnection()
+                # connection closed by a previous monitor is reestablished by the supervision
+                lines = [(client.getEIBPort(), None, con if con is not None and con.fd is not None else None)]
+            except OSError:
+                # daemon not available yet, connected by the supervision
+                lines = [(EIBClientFactory.findDaemonPort(), None, None)]
+        else:
+            # one group socket per daemon, each received by a thread of its own
+            lines = [(port, routing.getMask(port), None) for port in routing.ports]
+        threads = [threading.Thread(target=_EIBClientMonitor.__supervise, args=line + (stopping, connections),
+                                    name="EIBClientMonitor")
+                   for line in lines[1:]]
+        for thread in threads:
+            thread.start()
+        _EIBClientMonitor.__supervise(*lines[0], stopping, connections)
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def __supervise(port, routeMask, con, stopping, connections):
+        """
+        receives the telegrams of one daemon until the monitor is stopped
+        the connection is reestablished with exponential backoff if it fails, e.g. on a restart of the daemon
+        :param port:        socket path or host[:port] of the daemon
+        :param routeMask:   table with one entry per group address, telegrams of group addresses routed to another
+                            daemon are skipped, None to process all telegrams
+        :param con:         connection to start with, None to connect
+        :param stopping:    event set when the monitor is stopped
+        :param connections: daemon port -> connection of the monitor, swept by stopMonitor
+        """
+        minDelay, maxDelay = _EIBClientMonitor.__reconnectDelay
+        delay = minDelay
+        # kept across reconnects, released once the monitor has been stopped
+        telegramCounts = EIBMetrics.telegramCounts()
+        # telegrams per second before the outage, estimates the telegrams lost while disconnected
+        rate = 0.0
+        while not stopping.is_set():
+            try:
+                if con is None:
+                    con = EIBClient.createConnection(port)
+                connections[port] = con
+                # stopMonitor may have shut down the connections before this one has been registered
+                if stopping.is_set():
+                    if connections.get(port) is con:
+                        del connections[port]
+                    con.EIBClose()
+                    break
+                _EIBClientMonitor.__applyGroupFilter()
+                # register broadcast monitor
+                if con.EIBOpen_GroupSocket(0) == -1:
+                    raise ConnectionError(os.strerror(con.errno))
+            except OSError as e:
+                if not stopping.is_set():
+                    # retries are logged as debug only, the outage has been reported by the first warning
+                    _logger.log(logging.WARNING if delay == minDelay else logging.DEBUG,
+                                "Connecting bus monitor to %s failed - %s", port, e)
             else:
-                self.__informListener(listener, buf, dest, src)
+                EIBMetrics.monitorConnected(port, rate)
+                delay = minDelay
+                connected = time.monotonic()
+                received = _EIBClientMonitor.__receive(con, routeMask, telegramCounts)
+                elapsed = time.monotonic() - connected
+                rate = received / elapsed if elapsed > 0 else 0.0
+                if not stopping.is_set():
+                    _logger.warning("Bus monitor lost connection to %s - %s", port, os.strerror(con.errno))
+            if con is not None and connections.get(port) is con:
+                del connections[port]
+            if con is not None and con.fd is not None:
+                con.EIBClose()
+            con = None
+            if stopping.is_set():
+                break
+            EIBMetrics.monitorDisconnected(port)
+            # values cached by the client may have changed while disconnected
+            cache = _EIBClientMonitor.__valueCache
+            if cache is not None:
+                cache.clear()
+            stopping.wait(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, maxDelay)
+        EIBMetrics.releaseTelegramCounts(telegramCounts)
+
+    @staticmethod
+    def __receive(con, routeMask, telegramCounts) -> int:
+        """
+        receives the telegrams of one daemon until its connection fails or is shut down
+        :param telegramCounts:  dict of EIBMetrics counting the telegrams per group address
+        :return:                number of telegrams received
+        """
+        received = 0
+        while True:
+            try:
+                telegram = con.EIBGetGroupTelegram()
+            except OSError as e:
+                con.errno = e.errno or errno.EIO
+                break
+            if telegram is None:
+                break
+            received += 1
+            if routeMask is not None and not routeMask[telegram.dest]:
+                # e.g. forwarded by a line coupler, processed by the monitor of the daemon it is routed to
+                continue
+            telegramCounts[telegram.dest] = telegramCounts.get(telegram.dest, 0) + 1
+            # only for debug
+            # print("%s > %s: %s" % (printIndividual(telegram.src), printGroup(telegram.dest), telegram.payload))
+            try:
+                _EIBClientMonitor.process(telegram)
+            except Exception:
+                # a failing listener must not stop the monitor
+                _logger.exception("Processing telegram %s failed", telegram)
+        return received
+
+    @staticmethod
+    def process(telegram):
+        """
+        updates value cache, history and recording and informs the listeners
+        :param telegram:    Telegram received from the bus
+        """
+        cache = _EIBClientMonitor.__valueCache
+        if cache is not None:
+            cache.update(telegram.dest, telegram.src, telegram.payload)
+        history = _EIBClientMonitor.__history
+        if history is not None:
+            history.update(telegram.dest, telegram.src, telegram.payload)
+        recorder = _EIBClientMonitor.__recorder
+        if recorder is not None:
+            try:
+                recorder.record(telegram)
+            except ValueError:
+                # recording has been stopped concurrently
+                pass
+        _EIBClientMonitor.dispatch(telegram)
+
+    @staticmethod
+    def startMonitor():
+        """
+        starts the monitor thread unless already started
+        """
+        with _EIBClientMonitor.__startLock:
+            m = _EIBClientMonitor()
+            if m.ident is None:
+                _EIBClientMonitor.__stopping = threading.Event()
+                _EIBClientMonitor.__connections = {}
+                m.__generation = (_EIBClientMonitor.__stopping, _EIBClientMonitor.__connections)
+                m.start()
+
+    @staticmethod
+    def stopMonitor(timeout=None):
+        """
+        stops the monitor threads and closes their connections, listeners remain registered
+        the next call of startMonitor starts a new monitor
+        :param timeout: maximum seconds to wait for the monitor thread, not waited for if called by a listener
+        """
+        with _EIBClientMonitor.__startLock:
+            m = _EIBClientMonitor.__instance
+            if m is None or m.ident is None:
+                return
+            _EIBClientMonitor.__instance = None
+            _EIBClientMonitor.__stopping.set()
+            # unblock the receiving threads
+            for con in list(_EIBClientMonitor.__connections.values()):
+                try:
+                    con.fd.shutdown(socket.SHUT_RDWR)
+                except (OSError, AttributeError):
+                    pass
+        if m is not threading.current_thread():
+            m.join(timeout)
+
+    def stop(self, timeout=None):
+        """
+        stops the monitor, see stopMonitor
+        """
+        if self is _EIBClientMonitor.__instance:
+            _EIBClientMonitor.stopMonitor(timeout)
+
+    @staticmethod
+    def setReconnectDelay(minDelay, maxDelay):
+        """
+        applied by monitors started afterwards
+        """
+        _EIBClientMonitor.__reconnectDelay = (minDelay, maxDelay)
+
+    @staticmethod
+    def setValueCache(cache):
+        """
+        :type cache:    EIBGroupCache
+        """
+        _EIBClientMonitor.__valueCache = cache
+        _EIBClientMonitor.__applyGroupFilter()
 
     @staticmethod
-    def __informListener(listener, buf, dest, src):
-        listener.updateOccurred(src.data, buf.buffer)
+    def setHistory(history):
+        """
+        :type history:  EIBGroupHistory
+        """
+        _EIBClientMonitor.__history = history
+        _EIBClientMonitor.__applyGroupFilter()
+
+    @staticmethod
+    def setRecorder(recorder):
+        """
+        :type recorder: EIBRecorder
+        """
+        _EIBClientMonitor.__recorder = recorder
+        _EIBClientMonitor.__applyGroupFilter()
+
+    @staticmethod
+    def __applyGroupFilter():
+        # value cache, history and recorder need to see the telegrams of all group addresses,
+        # not only those having listeners
+        if (_EIBClientMonitor.__valueCache is not None or _EIBClientMonitor.__history is not None
+                or _EIBClientMonitor.__recorder is not None):
+            groupFilter = None
+        else:
+            groupFilter = _EIBClientMonitor.__listeners.flags
+        for con in list(_EIBClientMonitor.__connections.values()):
+            con.groupFilter = groupFilter
+
+    @staticmethod
+    def dispatch(telegram, index=None):
+        """
+        informs all listeners registered for the destination group address
+        :param telegram:    Telegram received by the monitor
+        :param index:       EIBListenerIndex of the listeners to inform, listeners registered at the monitor if None
+        """
+        listeners = (_EIBClientMonitor.__listeners if index is None else index).get(telegram.dest)
+        # continue in case no listener registered for destination
+        if not listeners:
+            return
+        # hand updates for batch listeners to the batcher, remaining listeners are informed immediately
+        batched = [rl for rl in listeners if rl.batchSize > 0]
+        if batched:
+            update = (telegram.src, telegram.dest, telegram.payload, time.time())
+            for rl in batched:
+                _EIBClientMonitor.__batcher.add(rl, update)
+            listeners = [rl for rl in listeners if rl.batchSize <= 0]
+            if not listeners:
+                return
+        dispatcher = _EIBClientMonitor.__dispatcher
+        if dispatcher is not None:
+            dispatcher.submit(listeners, telegram.src, telegram.dest, telegram.payload)
+            return
+        for rl in listeners:
+            start = time.perf_counter()
+            rl.updateOccurred(telegram.src, rl.decodeValue(telegram.payload))
+            EIBMetrics.observeCallback(rl, time.perf_counter() - start)
+
+    @staticmethod
+    def setDispatcher(dispatcher):
+        """
+        hands the listener callbacks to the dispatcher instead of calling them from the monitor thread
+        :type dispatcher:   EIBDispatcher
+        """
+        previous = _EIBClientMonitor.__dispatcher
+        if dispatcher is not None:
+            dispatcher.start()
+        _EIBClientMonitor.__dispatcher = dispatcher
+        if previous is not None and previous is not dispatcher:
+            previous.stop()
 
     @staticmethod
     def register(listener):
-        m = _EIBClientMonitor()
+        _EIBClientMonitor.addListener(listener)
 
-        # start thread once, temporary solution - see remarks below
-        if len(m.__listenerList) == 0:
-            m.start()
+        # initialize monitor in separate thread if not yet running
+        _EIBClientMonitor.startMonitor()
 
-        if not m.findListener(listener):
-            m.__listenerList.append(listener)
+    @staticmethod
+    def addListener(listener):
+        """
+        adds listener to the index without starting the monitor thread
+        """
+        _EIBClientMonitor.__listeners.add(listener)
 
-            # TODO for now is_alive() is not accurate enough and starts thread multiple times
-            #       see https://stackoverflow.com/questions/67099275/threadings-is-alive-method-not-returning-accurate-state
-            #       let's use listenerList size for now as the criteria to start the thread
-            # initialize monitor in separate thread if not yet running
-            # if not m.is_alive():
-            #    m.start()
+    @staticmethod
+    def removeListener(listener):
+        """
+        removes listener from the index without stopping the monitor thread
+        :raises:    ValueError if listener is not registered
+        """
+        _EIBClientMonitor.__listeners.remove(listener)
 
     @staticmethod
     def unregister(listener):
-        _EIBClientMonitor.__listenerList.remove(listener)
+        _EIBClientMonitor.removeListener(listener)
 
-        # stop monitoring if last listener removed
-        if len(_EIBClientMonitor.__listenerList) == 0:
-            _EIBClientMonitor().stop()
+        # stop monitoring if last listener removed and neither value cache, history nor recording rely on it
+        if (len(_EIBClientMonitor.__listeners) == 0 and _EIBClientMonitor.__valueCache is None
+                and _EIBClientMonitor.__history is None and _EIBClientMonitor.__recorder is None):
+            _EIBClientMonitor.stopMonitor()
+
+    @staticmethod
+    def getListeners() -> list:
+        """
+        :return:    all registered listeners
+        """
+        return list(_EIBClientMonitor.__listeners)
+
+    @staticmethod
+    def getPendingCount() -> int:
+        """
+        :return:    number of telegrams resp. updates queued for delivery by the dispatcher and the batcher
+        """
+        dispatcher = _EIBClientMonitor.__dispatcher
+        pending = _EIBClientMonitor.__batcher.pendingCount
+        return pending + dispatcher.queueDepth if dispatcher is not None else pending
 
     @staticmethod
     def findListener(listener=None, gaddrInt=0):
         """
-        Checks list of listeners for existance of corresponding listener identified by instance OR group address
+        Checks index of listeners for existance of corresponding listener identified by instance OR group address
         :type listener:     EIBClientListener
         :param gaddrInt:    group address under which listener instance is registered
         :type gaddrInt:     int
         :return:            list of one or multiple listeners registered for the same group address, None if not registered for address
         """
         ret = None
-        if listener and listener in _EIBClientMonitor.__listenerList:
+        index = _EIBClientMonitor.__listeners
+        if listener and listener in index:
             ret = [listener, ]
-        if gaddrInt >= 0:
-            for rl in _EIBClientMonitor.__listenerList:
-                if rl.gaddrInt == gaddrInt:
-                    # append matching listener instances
-                    if not ret:
-                        ret = []
-                    ret += [rl, ]
+        if gaddrInt >= 0 and index.get(gaddrInt):
+            # append matching listener instances
+            ret = (ret or []) + list(index.get(gaddrInt))
         return ret
 
 
+# queue depths of the bus monitor, evaluated when metrics are collected
+EIBMetrics.registerGauge("eib_listener_queue_depth", "Telegrams resp. updates queued for delivery to the listeners",
+                         _EIBClientMonitor.getPendingCount)
+EIBMetrics.registerGauge("eib_listeners", "Registered listeners", lambda: len(_EIBClientMonitor.getListeners()))
+
+
 if __name__ == '__main__':
     cf = EIBClientFactory()
     c = cf.getClient()
@@ -27,14 +27,44 @@
 
 import errno
 import socket
+import struct
+import time
+from collections import namedtuple
 from threading import BoundedSemaphore
 
+import address
+from dpt import decodeDPT
+from EIBMetrics import EIBMetrics
+
+# every eibd frame is prefixed by its length as 2 byte big endian value
+_FRAME_HEADER = struct.Struct('>H')
+_FRAME_MAXLEN = 0xffff
+# receive buffer size, large enough to hold a maximum sized frame plus many small telegrams
+_RECV_BUFSIZE = 1 << 17
+# maximum number of pipelined requests sent before their responses are read
+# keeps the responses well below the socket buffer so neither side blocks on write
+_PIPELINE_WINDOW = 256
+# message types sent without the daemon replying, not measured as requests
+_UNANSWERED = frozenset((37, 39))
+
 
 class EIBBuffer:
+    """
+    Payload container filled by the receiving requests.
+    The payload is stored as immutable bytes in raw, buffer provides the list of int representation
+    used by former versions of this library.
+    """
+
     def __init__(self, buf=None):
-        if buf is None:
-            buf = []
-        self.buffer = buf
+        self.raw = bytes(buf or b'')
+
+    @property
+    def buffer(self):
+        return list(self.raw)
+
+    @buffer.setter
+    def buffer(self, value):
+        self.raw = bytes(value)
 
 
 class EIBAddr:
@@ -57,6 +87,31 @@ class EIBInt32:
         self.data = value
 
 
+# application layer services of group telegrams, see Telegram.apci
+APCI_GROUP_READ = 0x000
+APCI_GROUP_RESPONSE = 0x040
+APCI_GROUP_WRITE = 0x080
+
+
+class Telegram(namedtuple('Telegram', 'src dest apci payload timestamp')):
+    """
+    Immutable record of a received group telegram, safe to be passed between threads
+    src:        individual address of the sender as int
+    dest:       group address as int
+    apci:       application layer service, APCI_GROUP_READ, APCI_GROUP_RESPONSE or APCI_GROUP_WRITE
+    payload:    APDU as bytes including TPCI/APCI, same format as EIBBuffer.raw of EIBGetGroup_Src
+    timestamp:  time of reception as time.monotonic()
+    """
+    __slots__ = ()
+
+    def decode(self, dpt):
+        """
+        :param dpt: datapoint type ("9.001")
+        :return:    native value of the telegram, None for group value reads
+        """
+        return decodeDPT(dpt, self.payload)
+
+
 class EIBConnection:
     # EIBConnection is not multi-threading proof, multiple concurrent thread will result in unforeseen errors
     # EIBConnection methods like EIB_CacheRead need to be treated atomar
@@ -64,13 +119,33 @@ class EIBConnection:
     __connSemaphore = None
 
     def __init__(self):
-        self.data = []
-        self.readlen = 0
-        self.datalen = 0
         self.fd = None
         self.errno = 0
+        # optional table with one entry per group address, EIBGetGroup_Src drops telegrams whose entry is 0
+        self.groupFilter = None
         self.__complete = None
         self.__connSemaphore = BoundedSemaphore(value=1)
+        # preallocated receive buffer, filled in large chunks via recv_into
+        # frames already received are parsed from the buffer without further syscalls
+        self.__recvBuf = bytearray(_RECV_BUFSIZE)
+        self.__recvView = memoryview(self.__recvBuf)
+        # frames collected while pipelining requests, None if requests are sent immediately
+        self.__sendQueue = None
+        # message type and send time of the request awaiting its reply, None if no reply is pending
+        self.__request = None
+        self.__counters = EIBMetrics.connectionCounters(self)
+        self.__EIB_ResetReader()
+
+    def __EIB_ResetReader(self):
+        self.data = b''
+        self.readlen = 0
+        self.datalen = 0
+        # begin of the current frame and end of the received data within the receive buffer
+        self.__recvStart = 0
+        self.__recvEnd = 0
+        # length of the frame handed out last, dropped from the buffer with the next request
+        self.__frameLen = 0
+        self.__blocking = None
 
     def EIBSocketLocal(self, path):
         if self.fd != None:
@@ -78,8 +153,7 @@ class EIBConnection:
             return -1
         fd = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         fd.connect(path)
-        self.data = []
-        self.readlen = 0
+        self.__EIB_ResetReader()
         self.fd = fd
         return 0
 
@@ -89,8 +163,7 @@ class EIBConnection:
             return -1
         fd = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         fd.connect((host, port))
-        self.data = []
-        self.readlen = 0
+        self.__EIB_ResetReader()
         self.fd = fd
         return 0
 
@@ -109,7 +182,13 @@ class EIBConnection:
         if self.__complete == None:
             self.errno = errno.EINVAL
             return -1
-        return self.__complete()
+        request = self.__request
+        if request is None:
+            return self.__complete()
+        self.__request = None
+        result = self.__complete()
+        EIBMetrics.observeRequest(request[0], time.perf_counter() - request[1])
+        return result
 
     def EIBClose(self):
         if self.fd == None:
@@ -117,6 +196,7 @@ class EIBConnection:
             return -1
         self.fd.close()
         self.fd = None
+        self.__EIB_ResetReader()
 
     def EIBClose_sync(self):
         self.EIBReset()
@@ -129,12 +209,55 @@ class EIBConnection:
         if len(data) < 2 or len(data) > 0xffff:
             self.errno = errno.EINVAL
             return -1
-        data = [(len(data) >> 8) & 0xff, (len(data)) & 0xff] + data
-        result = ''
-        for i in data:
-            result += chr(i)
-        self.fd.send(result.encode())
-        return 0
+        frame = _FRAME_HEADER.pack(len(data)) + bytes(data)
+        msgType = (data[0] << 8) | data[1]
+        if msgType not in _UNANSWERED:
+            self.__request = (msgType, time.perf_counter())
+        if self.__sendQueue is not None:
+            self.__sendQueue.append(frame)
+        else:
+            self.fd.sendall(frame)
+            counters = self.__counters
+            counters.framesOut += 1
+            counters.bytesOut += len(frame)
+        return 0
+
+    def __EIB_FlushRequests(self):
+        """
+        sends all queued requests with a single write and stops queueing
+        """
+        queue = self.__sendQueue
+        self.__sendQueue = None
+        if queue:
+            data = b''.join(queue)
+            self.fd.sendall(data)
+            counters = self.__counters
+            counters.framesOut += len(queue)
+            counters.bytesOut += len(data)
+
+    def __EIB_SendFrames(self, frames):
+        """
+        writes all frames at once, partial writes are continued until all data is sent or the socket fails
+        :return:    number of frames sent completely, errno is set if not all frames were sent
+        """
+        data = memoryview(b''.join(frames))
+        offset = 0
+        try:
+            while offset < len(data):
+                offset += self.fd.send(data[offset:])
+        except OSError as e:
+            self.errno = e.errno or errno.EIO
+        sent = 0
+        end = 0
+        for frame in frames:
+            end += len(frame)
+            if end > offset:
+                break
+            sent += 1
+        counters = self.__counters
+        counters.framesOut += sent
+        counters.bytesOut += offset
+        return sent
 
     def EIB_Poll_FD(self):
         if self.fd == None:
@@ -155,31 +278,67 @@ class EIBConnection:
                 return -1
             if self.readlen >= 2 and self.readlen >= self.datalen + 2:
                 self.readlen = 0
+                self.__counters.framesIn += 1
                 return 0
 
     def __EIB_CheckRequest(self, block):
         if self.fd == None:
             self.errno = errno.ECONNRESET
             return -1
-        if self.readlen == 0:
-            self.head = []
-            self.data = []
-        if self.readlen < 2:
+        if self.readlen == 0 and self.__frameLen:
+            # previous frame has been processed, drop it from the receive buffer
+            self.__recvStart += self.__frameLen
+            self.__frameLen = 0
+            if self.__recvStart == self.__recvEnd:
+                self.__recvStart = self.__recvEnd = 0
+        self.__EIB_ParseFrame()
+        if self.readlen < 2 or self.readlen < self.datalen + 2:
+            result = self.__EIB_Recv(block)
+            if result == -1:
+                return -1
+            self.__EIB_ParseFrame()
+        if self.readlen >= 2 and self.readlen >= self.datalen + 2:
+            self.__frameLen = self.readlen
+        return 0
+
+    def __EIB_ParseFrame(self):
+        """
+        determines the state of the current frame from the receive buffer
+        received part of the frame is exposed via self.data without copying
+        """
+        start = self.__recvStart
+        available = self.__recvEnd - start
+        if available < 2:
+            self.readlen = available
+            return
+        self.datalen = _FRAME_HEADER.unpack_from(self.__recvBuf, start)[0]
+        self.readlen = min(available, self.datalen + 2)
+        self.data = self.__recvView[start + 2:start + self.readlen]
+
+    def __EIB_Recv(self, block):
+        """
+        reads as much data as available into the receive buffer with a single syscall
+        :return:    number of bytes read, 0 if no data is available on a non-blocking socket, -1 on EOF
+        """
+        if self.__blocking != block:
             self.fd.setblocking(block)
-            result = self.fd.recv(2 - self.readlen)
-            for a in result:
-                self.head.append(ord(chr(a)))
-            self.readlen += len(result)
-        if self.readlen < 2:
+            self.__blocking = block
+        # make room for the remainder of the current frame by moving it to the buffer start
+        if self.__recvStart and self.__recvStart + _FRAME_MAXLEN + 2 > _RECV_BUFSIZE:
+            pending = self.__recvEnd - self.__recvStart
+            self.__recvBuf[:pending] = self.__recvBuf[self.__recvStart:self.__recvEnd]
+            self.__recvStart = 0
+            self.__recvEnd = pending
+        try:
+            result = self.fd.recv_into(self.__recvView[self.__recvEnd:])
+        except BlockingIOError:
             return 0
-        self.datalen = (self.head[0] << 8) | self.head[1]
-        if self.readlen < self.datalen + 2:
-            self.fd.setblocking(block)
-            result = self.fd.recv(self.datalen + 2 - self.readlen)
-            for a in result:
-                self.data.append(ord(chr(a)))
-            self.readlen += len(result)
-        return 0
+        if result == 0:
+            self.errno = errno.ECONNRESET
+            return -1
+        self.__recvEnd += result
+        self.__counters.bytesIn += result
+        return result
 
     def __EIBGetAPDU_Complete(self):
         self.__complete = None
@@ -188,8 +347,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 37 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIBGetAPDU_async(self, buf):
         ibuf = [0] * 2
@@ -211,8 +370,8 @@ class EIBConnection:
             return -1
         if self.ptr5 != None:
             self.ptr5.data = (((self.data[2]) << 8) | (self.data[2 + 1]))
-        self.buf.buffer = self.data[4:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[4:])
+        return len(self.buf.raw)
 
     def EIBGetAPDU_Src_async(self, buf, src):
         ibuf = [0] * 2
@@ -233,8 +392,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 20 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIBGetBusmonitorPacket_async(self, buf):
         ibuf = [0] * 2
@@ -249,17 +408,21 @@ class EIBConnection:
 
     def __EIBGetGroup_Src_Complete(self):
         self.__complete = None
-        if self.__EIB_GetRequest() == -1:
-            return -1
-        if (((self.data[0]) << 8) | (self.data[0 + 1])) != 39 or len(self.data) < 6:
-            self.errno = errno.ECONNRESET
-            return -1
+        while True:
+            if self.__EIB_GetRequest() == -1:
+                return -1
+            if (((self.data[0]) << 8) | (self.data[0 + 1])) != 39 or len(self.data) < 6:
+                self.errno = errno.ECONNRESET
+                return -1
+            # skip telegrams to destinations not selected by the group filter
+            if self.groupFilter is None or self.groupFilter[((self.data[4]) << 8) | (self.data[4 + 1])]:
+                break
         if self.ptr5 != None:
             self.ptr5.data = (((self.data[2]) << 8) | (self.data[2 + 1]))
         if self.ptr6 != None:
             self.ptr6.data = (((self.data[4]) << 8) | (self.data[4 + 1]))
-        self.buf.buffer = self.data[6:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[6:])
+        return len(self.buf.raw)
 
     def EIBGetGroup_Src_async(self, buf, src, dest):
         ibuf = [0] * 2
@@ -274,6 +437,35 @@ class EIBConnection:
             return -1
         return self.EIBComplete()
 
+    def __EIBGetGroupTelegram_Complete(self):
+        self.__complete = None
+        while True:
+            if self.__EIB_GetRequest() == -1:
+                return None
+            data = self.data
+            if ((data[0] << 8) | data[1]) != 39 or len(data) < 6:
+                self.errno = errno.ECONNRESET
+                return None
+            dest = (data[4] << 8) | data[5]
+            # skip telegrams to destinations not selected by the group filter
+            if self.groupFilter is None or self.groupFilter[dest]:
+                break
+        apci = ((data[6] & 0x03) << 8) | (data[7] & 0xC0) if len(data) >= 8 else APCI_GROUP_READ
+        return Telegram((data[2] << 8) | data[3], dest, apci, bytes(data[6:]), time.monotonic())
+
+    def EIBGetGroupTelegram_async(self):
+        self.__complete = self.__EIBGetGroupTelegram_Complete
+        return 0
+
+    def EIBGetGroupTelegram(self):
+        """
+        receives the next group telegram on a group socket opened with EIBOpen_GroupSocket
+        :return:    Telegram, None on error with errno set
+        """
+        if self.EIBGetGroupTelegram_async() == -1:
+            return None
+        return self.EIBComplete()
+
     def __EIBGetTPDU_Complete(self):
         self.__complete = None
         if self.__EIB_GetRequest() == -1:
@@ -283,8 +475,8 @@ class EIBConnection:
             return -1
         if self.ptr5 != None:
             self.ptr5.data = (((self.data[2]) << 8) | (self.data[2 + 1]))
-        self.buf.buffer = self.data[4:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[4:])
+        return len(self.buf.raw)
 
     def EIBGetTPDU_async(self, buf, src):
         ibuf = [0] * 2
@@ -385,8 +577,8 @@ class EIBConnection:
             return -1
         if self.ptr5 != None:
             self.ptr5.data = (((self.data[2]) << 8) | (self.data[2 + 1]))
-        self.buf.buffer = self.data[6:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[6:])
+        return len(self.buf.raw)
 
     def EIB_Cache_Read_async(self, dst, src, buf):
         ibuf = [0] * 4
@@ -422,8 +614,8 @@ class EIBConnection:
             return -1
         if self.ptr5 != None:
             self.ptr5.data = (((self.data[2]) << 8) | (self.data[2 + 1]))
-        self.buf.buffer = self.data[6:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[6:])
+        return len(self.buf.raw)
 
     def EIB_Cache_Read_Sync_async(self, dst, src, buf, age):
         ibuf = [0] * 6
@@ -441,9 +633,48 @@ class EIBConnection:
         return 0
 
     def EIB_Cache_Read_Sync(self, dst, src, buf, age):
-        if self.EIB_Cache_Read_Sync_async(dst, src, buf, age) == -1:
-            return -1
-        return self.EIBComplete()
+        with self.__connSemaphore:
+            if self.EIB_Cache_Read_Sync_async(dst, src, buf, age) == -1:
+                return -1
+            return self.EIBComplete()
+
+    def EIB_Cache_Read_Many(self, dsts, srcs, bufs, age=None):
+        """
+        pipelined EIB_Cache_Read resp. EIB_Cache_Read_Sync for multiple group addresses
+        requests are written back-to-back, eibd answers them in request order
+        :param dsts:    list of group addresses
+        :param srcs:    list of EIBAddr receiving the source address, one per group address
+        :param bufs:    list of EIBBuffer receiving the value, one per group address
+        :param age:     maximum age as for EIB_Cache_Read_Sync, None for EIB_Cache_Read
+        :return:        list of (result, errno) per group address, result as returned by EIB_Cache_Read
+        """
+        ret = []
+        with self.__connSemaphore:
+            for i in range(0, len(dsts), _PIPELINE_WINDOW):
+                pending = []
+                self.__sendQueue = []
+                try:
+                    for dst, src, buf in zip(dsts[i:i + _PIPELINE_WINDOW],
+                                             srcs[i:i + _PIPELINE_WINDOW],
+                                             bufs[i:i + _PIPELINE_WINDOW]):
+                        if age is None:
+                            result = self.EIB_Cache_Read_async(dst, src, buf)
+                        else:
+                            result = self.EIB_Cache_Read_Sync_async(dst, src, buf, age)
+                        if result == -1:
+                            return ret + [(-1, self.errno)] * (len(dsts) - len(ret))
+                        pending.append((self.__complete, self.__request, src, buf))
+                finally:
+                    self.__EIB_FlushRequests()
+                for complete, request, src, buf in pending:
+                    # restore the state of the request the next response belongs to
+                    self.__complete = complete
+                    self.__request = request
+                    self.ptr5 = src
+                    self.buf = buf
+                    result = self.EIBComplete()
+                    ret.append((result, self.errno if result == -1 else 0))
+        return ret
 
     def __EIB_Cache_Remove_Complete(self):
         self.__complete = None
@@ -758,8 +989,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 83 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIB_MC_PropertyRead_async(self, obj, propertyno, start, nr_of_elem, buf):
         ibuf = [0] * 7
@@ -788,8 +1019,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 98 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIB_MC_PropertyScan_async(self, buf):
         ibuf = [0] * 2
@@ -813,8 +1044,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 84 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIB_MC_PropertyWrite_async(self, obj, propertyno, start, nr_of_elem, buf, res):
         ibuf = [0] * 7
@@ -876,8 +1107,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 81 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIB_MC_Read_async(self, addr, buf_len, buf):
         ibuf = [0] * 6
@@ -1155,8 +1386,8 @@ class EIBConnection:
         if (((self.data[0]) << 8) | (self.data[0 + 1])) != 50 or len(self.data) < 2:
             self.errno = errno.ECONNRESET
             return -1
-        self.buf.buffer = self.data[2:]
-        return len(self.buf.buffer)
+        self.buf.raw = bytes(self.data[2:])
+        return len(self.buf.raw)
 
     def EIB_M_ReadIndividualAddresses_async(self, buf):
         ibuf = [0] * 2
@@ -1524,6 +1755,29 @@ class EIBConnection:
             return -1
         return self.sendlen
 
+    def EIBSendGroup_Many(self, dests, datas):
+        """
+        sends group telegrams to multiple group addresses with a single write
+        :param dests:   list of group addresses
+        :param datas:   list of APDUs, one per group address
+        :return:        list of (result, errno) per telegram, result as returned by EIBSendGroup
+        """
+        results = []
+        self.__sendQueue = []
+        try:
+            for dest, data in zip(dests, datas):
+                result = self.EIBSendGroup(dest, data)
+                results.append((result, self.errno if result == -1 else 0))
+        finally:
+            frames = self.__sendQueue
+            self.__sendQueue = None
+        sent = self.__EIB_SendFrames(frames)
+        # mark telegrams not written due to a socket error as failed
+        queued = [i for i, (result, err) in enumerate(results) if result != -1]
+        for i in queued[sent:]:
+            results[i] = (-1, self.errno)
+        return results
+
     def EIBSendTPDU(self, dest, data):
         ibuf = [0] * 4
         ibuf[2] = ((dest >> 8) & 0xff)
@@ -1605,25 +1859,22 @@ IMG_KEY_WRITE = 61
 
 
 def readaddr(addr):
-    if addr.find(".") != -1:
-        (a, b, c) = addr.split(".")
-        return ((int(a) & 0x0f) << 12) | ((int(b) & 0x0f) << 8) | ((int(c) & 0xff))
-    return int(addr, 16) & 0xffff
+    """
+    individual address "1.1.3", plain numbers are read as hex
+    """
+    return address.readaddr(addr, 16)
 
 
 def readgaddr(addr):
-    if addr.count("/") == 2:
-        (a, b, c) = addr.split("/")
-        return ((int(a) & 0x1f) << 11) | ((int(b) & 0x07) << 8) | ((int(c) & 0xff))
-    elif addr.count("/") == 1:
-        (a, b) = addr.split("/")
-        return ((int(a) & 0x1f) << 11) | ((int(b) & 0x7FF))
-    return int(addr, 16) & 0xffff
+    """
+    group address "1/0/3" resp. "1/3", plain numbers are read as hex
+    """
+    return address.readgaddr(addr, 16)
 
 
 def group2string(addr):
-    return ("%d/%d/%d" % ((addr >> 11) & 0x1f, (addr >> 8) & 0x07, (addr) & 0xff))
+    return address.printGroupSlash(addr)
 
 
 def individual2string(addr):
-    return ("%d.%d.%d" % ((addr >> 12) & 0x0f, (addr >> 8) & 0x0f, (addr) & 0xff))
+    return address.printIndividual(addr)
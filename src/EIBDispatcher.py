@@ -0,0 +1,224 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from EIBMetrics import EIBMetrics
+
+_logger = logging.getLogger(__name__)
+
+
+class EIBDispatcher(object):
+    """
+    Dispatch stage decoupling the bus monitor from the listener callbacks
+    Telegrams are queued to a pool of worker threads calling the listeners. All telegrams of a group address
+    are handled by the same worker, so listeners receive the updates of a group address in order. If the queue
+    of a worker is full, the telegram is dropped and counted as overflow instead of stalling the monitor.
+    """
+
+    def __init__(self, workers=4, maxQueueSize=10000, block=False):
+        """
+        :param workers:         number of worker threads calling the listeners
+        :param maxQueueSize:    maximum number of telegrams queued per worker
+        :param block:           wait for queue space instead of dropping telegrams if the queue is full
+        """
+        if workers < 1:
+            raise ValueError("At least one worker required")
+        self.__queues = [queue.Queue(maxQueueSize) for _ in range(workers)]
+        self.__workers = []
+        self.__block = block
+        self.__overflowCount = 0
+        self.__errorCount = 0
+        self.__maxQueueDepth = 0
+
+    @property
+    def workerCount(self) -> int:
+        return len(self.__queues)
+
+    @property
+    def queueDepth(self) -> int:
+        """
+        number of telegrams currently waiting for delivery
+        """
+        return sum(q.qsize() for q in self.__queues)
+
+    @property
+    def maxQueueDepth(self) -> int:
+        """
+        highest number of telegrams waiting in a single worker queue since start
+        """
+        return self.__maxQueueDepth
+
+    @property
+    def overflowCount(self) -> int:
+        """
+        number of telegrams dropped due to a full queue
+        """
+        return self.__overflowCount
+
+    @property
+    def errorCount(self) -> int:
+        """
+        number of listener callbacks that raised an exception
+        """
+        return self.__errorCount
+
+    def getStatistics(self) -> dict:
+        return {'workers': self.workerCount,
+                'queueDepth': self.queueDepth,
+                'maxQueueDepth': self.__maxQueueDepth,
+                'overflowCount': self.__overflowCount,
+                'errorCount': self.__errorCount}
+
+    def start(self):
+        if self.__workers:
+            return
+        for q in self.__queues:
+            worker = threading.Thread(target=self.__run, args=(q,), name="EIBDispatcher", daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+    def stop(self, timeout=None):
+        """
+        stops the workers after the telegrams already queued have been delivered
+        """
+        for q in self.__queues:
+            q.put(None)
+        for worker in self.__workers:
+            worker.join(timeout)
+        self.__workers = []
+
+    def submit(self, listeners, srcAddr, destAddr, val) -> bool:
+        """
+        queues a telegram for delivery to the listeners
+        :param listeners:   listeners to be informed
+        :param srcAddr:     individual address of the sender
+        :param destAddr:    group address the value was sent to, selects the worker
+        :param val:         APDU of the telegram, converted by each listener via decodeValue
+        :return:            False if the telegram was dropped due to a full queue
+        """
+        q = self.__queues[destAddr % len(self.__queues)]
+        try:
+            q.put((listeners, srcAddr, val), self.__block)
+        except queue.Full:
+            self.__overflowCount += 1
+            return False
+        depth = q.qsize()
+        if depth > self.__maxQueueDepth:
+            self.__maxQueueDepth = depth
+        return True
+
+    def __run(self, q):
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            listeners, srcAddr, val = item
+            for rl in listeners:
+                start = time.perf_counter()
+                try:
+                    rl.updateOccurred(srcAddr, rl.decodeValue(val))
+                    EIBMetrics.observeCallback(rl, time.perf_counter() - start)
+                except Exception:
+                    self.__errorCount += 1
+                    _logger.exception("Listener %s failed", rl)
+
+
+class EIBBatcher(object):
+    """
+    Coalesces the updates per listener and delivers them via updateOccurredBatch
+    A batch is delivered once batchSize updates are pending or the oldest pending update waited for
+    batchLatency seconds. Batches are delivered by a separate thread, so the monitor only appends the updates.
+    """
+
+    def __init__(self):
+        # listener -> list of pending updates
+        self.__pending = {}
+        # listener -> monotonic time the pending updates are due for delivery
+        self.__deadlines = {}
+        self.__condition = threading.Condition()
+        self.__thread = None
+        self.__errorCount = 0
+
+    @property
+    def pendingCount(self) -> int:
+        """
+        number of updates waiting for delivery
+        """
+        with self.__condition:
+            return sum(len(updates) for updates in self.__pending.values())
+
+    @property
+    def errorCount(self) -> int:
+        """
+        number of batch callbacks that raised an exception
+        """
+        return self.__errorCount
+
+    def add(self, listener, update):
+        """
+        queues an update for the listener
+        :param listener:    listener with batchSize > 0
+        :param update:      tuple (srcAddr, destAddr, APDU, timestamp), APDU is converted via decodeValue
+        """
+        with self.__condition:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="EIBBatcher", daemon=True)
+                self.__thread.start()
+            pending = self.__pending.get(listener)
+            if pending is None:
+                pending = self.__pending[listener] = []
+                self.__deadlines[listener] = time.monotonic() + listener.batchLatency
+                self.__condition.notify()
+            pending.append(update)
+            if len(pending) == listener.batchSize:
+                # batch is full, deliver immediately
+                self.__deadlines[listener] = 0
+                self.__condition.notify()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                now = time.monotonic()
+                due = [rl for rl, deadline in self.__deadlines.items() if deadline <= now]
+                if not due:
+                    timeout = min(self.__deadlines.values()) - now if self.__deadlines else None
+                    self.__condition.wait(timeout)
+                    continue
+                batches = []
+                for rl in due:
+                    del self.__deadlines[rl]
+                    batches.append((rl, self.__pending.pop(rl)))
+
+            for rl, updates in batches:
+                for i in range(0, len(updates), rl.batchSize):
+                    start = time.perf_counter()
+                    try:
+                        rl.updateOccurredBatch([(srcAddr, destAddr, rl.decodeValue(raw), timestamp)
+                                                for srcAddr, destAddr, raw, timestamp
+                                                in updates[i:i + rl.batchSize]])
+                        EIBMetrics.observeCallback(rl, time.perf_counter() - start)
+                    except Exception:
+                        self.__errorCount += 1
+                        _logger.exception("Listener %s failed", rl)
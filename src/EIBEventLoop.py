@@ -0,0 +1,278 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import errno
+import logging
+import os
+import selectors
+import socket
+import threading
+
+from EIBClient import EIBClient, _EIBClientMonitor
+from EIBConnection import EIBConnection
+from EIBMetrics import EIBMetrics
+
+_logger = logging.getLogger(__name__)
+
+# telegrams processed per connection before the other connections are served
+_MAX_BATCH = 1024
+
+
+class _EIBLoopEntry(object):
+    __slots__ = ('connection', 'handler', 'closed')
+
+    def __init__(self, connection, handler, closed):
+        self.connection = connection
+        self.handler = handler
+        self.closed = closed
+
+
+class EIBEventLoop(object):
+    """
+    Single thread receiving the group telegrams of many connections, e.g. one per daemon of a building line
+    The sockets are watched by a selector (epoll on Linux) via EIB_Poll_FD, received data is parsed by the frame
+    reader of each connection via EIB_Poll_Complete and every completed telegram is passed to a handler.
+    By default telegrams are processed like those of the bus monitor: value cache, history, recording and listeners.
+    """
+
+    def __init__(self, handler=None, groupFilter=None):
+        """
+        :param handler:     function called with each received Telegram, _EIBClientMonitor.process if not set
+        :param groupFilter: optional table with one entry per group address, telegrams whose entry is 0 are dropped
+        """
+        self.__handler = handler or _EIBClientMonitor.process
+        self.groupFilter = groupFilter
+        self.__selector = selectors.DefaultSelector()
+        self.__lock = threading.Lock()
+        # connection -> socket registered at the selector
+        self.__connections = {}
+        # entries with complete frames left in their receive buffer after _MAX_BATCH telegrams
+        self.__pending = []
+        # wakes up the selector when connections are added or the loop is stopped from another thread
+        self.__wakeupRead, self.__wakeupWrite = socket.socketpair()
+        self.__wakeupRead.setblocking(False)
+        self.__wakeupWrite.setblocking(False)
+        self.__selector.register(self.__wakeupRead, selectors.EVENT_READ, None)
+        self.__running = False
+        self.__thread = None
+        self.__telegramCounts = EIBMetrics.telegramCounts()
+        self.__telegrams = 0
+        self.__errors = 0
+
+    def __len__(self):
+        return len(self.__connections)
+
+    def getStatistics(self) -> dict:
+        return {'connections': len(self.__connections),
+                'telegrams': self.__telegrams,
+                'handlerErrors': self.__errors}
+
+    def open(self, port, handler=None, closed=None) -> EIBConnection:
+        """
+        connects to a daemon, opens a group socket and adds it to the loop
+        :param port:        socket path or host[:port] of the daemon
+        :param handler:     function called with each Telegram of this connection, handler of the loop if not set
+        :param closed:      function called with the connection and errno once the connection failed
+        :return:            connection
+        :raises:            ConnectionError if the group socket cannot be opened
+        """
+        con = EIBClient.createConnection(port)
+        if con.EIBOpen_GroupSocket(0) == -1:
+            con.EIBClose()
+            raise ConnectionError("Open group socket failed - " + os.strerror(con.errno))
+        self.add(con, handler, closed)
+        return con
+
+    def add(self, connection, handler=None, closed=None):
+        """
+        adds a connection with an open group socket (EIBOpen_GroupSocket), may be called from any thread
+        :param connection:  EIBConnection without groupFilter, skipping telegrams in the connection would block
+        :param handler:     function called with each Telegram of this connection, handler of the loop if not set
+        :param closed:      function called with the connection and errno once the daemon closed the connection
+                            or it failed, the connection has been removed from the loop and closed before
+        :raises:            ValueError if the connection is not open or has a group filter
+        """
+        if connection.groupFilter is not None:
+            raise ValueError("Group filter of the connection not supported, use the group filter of the loop")
+        fd = connection.EIB_Poll_FD()
+        if fd == -1:
+            raise ValueError("Connection not open")
+        with self.__lock:
+            if connection in self.__connections:
+                raise ValueError("Connection already added")
+            self.__selector.register(fd, selectors.EVENT_READ,
+                                     _EIBLoopEntry(connection, handler or self.__handler, closed))
+            self.__connections[connection] = fd
+        self.__wakeup()
+
+    def remove(self, connection):
+        """
+        removes a connection from the loop without closing it
+        :raises:    ValueError if the connection has not been added
+        """
+        with self.__lock:
+            fd = self.__connections.pop(connection, None)
+            if fd is None:
+                raise ValueError("Connection not added")
+            self.__selector.unregister(fd)
+            self.__pending = [e for e in self.__pending if e.connection is not connection]
+
+    def runOnce(self, timeout=None) -> int:
+        """
+        waits for data on any connection and processes the telegrams received completely
+        :param timeout: maximum seconds to wait, None to wait until data has been received
+        :return:        number of telegrams processed
+        """
+        pending = self.__pending
+        self.__pending = []
+        # frames left in a receive buffer are not signaled by the selector, do not wait for new data then
+        events = self.__selector.select(0 if pending else timeout)
+        count = 0
+        for entry in pending:
+            if entry.connection in self.__connections:
+                count += self.__receive(entry)
+        for key, mask in events:
+            if key.data is None:
+                self.__drainWakeup()
+            elif key.data not in pending:
+                count += self.__receive(key.data)
+        return count
+
+    def __receive(self, entry) -> int:
+        """
+        processes the telegrams of one connection until its receive buffer holds no complete frame
+        """
+        con = entry.connection
+        handler = entry.handler
+        groupFilter = self.groupFilter
+        telegramCounts = self.__telegramCounts
+        count = 0
+        while True:
+            if count == _MAX_BATCH:
+                self.__pending.append(entry)
+                break
+            try:
+                ready = con.EIB_Poll_Complete()
+                if ready == 1:
+                    con.EIBGetGroupTelegram_async()
+                    telegram = con.EIBComplete()
+                    if telegram is None:
+                        ready = -1
+            except OSError as e:
+                con.errno = e.errno or errno.EIO
+                ready = -1
+            if ready == 0:
+                break
+            if ready == -1:
+                self.__close(entry)
+                break
+            count += 1
+            telegramCounts[telegram.dest] = telegramCounts.get(telegram.dest, 0) + 1
+            if groupFilter is not None and not groupFilter[telegram.dest]:
+                continue
+            try:
+                handler(telegram)
+            except Exception:
+                # a failing handler must not stop the telegrams of the other connections
+                self.__errors += 1
+                _logger.exception("Handler failed for telegram %s", telegram)
+        self.__telegrams += count
+        return count
+
+    def __close(self, entry):
+        con = entry.connection
+        err = con.errno
+        try:
+            self.remove(con)
+        except ValueError:
+            pass
+        if con.fd is not None:
+            con.EIBClose()
+        if entry.closed is not None:
+            entry.closed(con, err)
+
+    def __wakeup(self):
+        try:
+            self.__wakeupWrite.send(b'\0')
+        except BlockingIOError:
+            # wakeup already pending
+            pass
+
+    def __drainWakeup(self):
+        try:
+            while self.__wakeupRead.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def run(self):
+        """
+        processes telegrams in the calling thread until stop is called
+        """
+        self.__running = True
+        self.__loop()
+
+    def __loop(self):
+        while self.__running:
+            self.runOnce()
+
+    def start(self):
+        """
+        runs the loop in a background thread
+        """
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__running = True
+            self.__thread = threading.Thread(target=self.__loop, name="EIBEventLoop", daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        stops the loop after the telegrams currently processed, connections are kept
+        """
+        self.__running = False
+        self.__wakeup()
+        thread = self.__thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            self.__thread = None
+
+    def close(self):
+        """
+        stops the loop and closes all connections
+        """
+        self.stop()
+        with self.__lock:
+            connections = list(self.__connections)
+        for con in connections:
+            self.remove(con)
+            if con.fd is not None:
+                con.EIBClose()
+        EIBMetrics.releaseTelegramCounts(self.__telegramCounts)
+        self.__selector.close()
+        self.__wakeupRead.close()
+        self.__wakeupWrite.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
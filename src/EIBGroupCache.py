@@ -0,0 +1,112 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import collections
+import threading
+import time
+
+# cached value of a group address
+# srcAddr:      individual address of the sender
+# raw:          APDU as received, including the APCI bytes
+# timestamp:    time of reception as returned by time.time(), 0 if unknown
+EIBCacheEntry = collections.namedtuple('EIBCacheEntry', ['srcAddr', 'raw', 'timestamp'])
+
+
+class EIBGroupCache(object):
+    """
+    In-process cache of the latest value per group address
+    Fed by the bus monitor, so reads of recently sent values do not need a request to the daemon.
+    Size is bounded, the least recently used group address is evicted first.
+    """
+
+    def __init__(self, maxSize=10000):
+        """
+        :param maxSize: maximum number of group addresses kept in the cache
+        """
+        if maxSize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.__maxSize = maxSize
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def maxSize(self) -> int:
+        return self.__maxSize
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def getStatistics(self) -> dict:
+        return {'size': len(self.__entries),
+                'maxSize': self.__maxSize,
+                'hits': self.__hits,
+                'misses': self.__misses}
+
+    def update(self, gaddrInt, srcAddr, raw, timestamp=None):
+        """
+        stores the value sent to a group address
+        telegrams not carrying a value (group value read requests) are ignored
+        :param gaddrInt:    group address
+        :param srcAddr:     individual address of the sender
+        :param raw:         APDU as bytes, including the APCI bytes
+        :param timestamp:   time of reception, now if not set
+        """
+        if len(raw) < 2 or not raw[1] & 0xC0:
+            return
+        entry = EIBCacheEntry(srcAddr, bytes(raw), time.time() if timestamp is None else timestamp)
+        with self.__lock:
+            self.__entries[gaddrInt] = entry
+            self.__entries.move_to_end(gaddrInt)
+            if len(self.__entries) > self.__maxSize:
+                self.__entries.popitem(last=False)
+
+    def get(self, gaddrInt, age=None):
+        """
+        :param gaddrInt:    group address
+        :param age:         maximum age of the value in seconds, None to accept any cached value
+        :return:            EIBCacheEntry, None if not cached or older than age
+        """
+        with self.__lock:
+            entry = self.__entries.get(gaddrInt)
+            if entry is not None and (age is None or entry.timestamp >= time.time() - age):
+                self.__entries.move_to_end(gaddrInt)
+                self.__hits += 1
+                return entry
+            self.__misses += 1
+            return None
+
+    def remove(self, gaddrInt):
+        with self.__lock:
+            self.__entries.pop(gaddrInt, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,202 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import array
+import collections
+import threading
+import time
+
+from EIBGroupCache import EIBCacheEntry
+
+# largest APDU of a standard frame, TPCI/APCI followed by up to 14 bytes (DPT 16)
+_MAX_VALUE_SIZE = 16
+
+
+class _EIBHistoryRing(object):
+    """
+    ring buffer of one group address, values are kept in preallocated columns
+    """
+    __slots__ = ('timestamps', 'srcAddrs', 'lengths', 'values', 'next', 'count')
+
+    def __init__(self, depth, valueSize):
+        self.timestamps = array.array('d', bytes(8 * depth))
+        self.srcAddrs = array.array('H', bytes(2 * depth))
+        self.lengths = array.array('B', bytes(depth))
+        self.values = bytearray(depth * valueSize)
+        # slot written next and number of valid slots
+        self.next = 0
+        self.count = 0
+
+
+class EIBGroupHistory(object):
+    """
+    In-process history of the latest values per group address
+    Fed by the bus monitor, each group address keeps its last values in a fixed size ring buffer.
+    Memory is allocated per group address on its first value and bounded by depth and maxAddresses,
+    the least recently updated group address is evicted first.
+    """
+
+    def __init__(self, depth=64, maxAddresses=5000, valueSize=_MAX_VALUE_SIZE):
+        """
+        :param depth:           number of values kept per group address
+        :param maxAddresses:    maximum number of group addresses kept
+        :param valueSize:       bytes reserved per value, longer APDUs are truncated
+        """
+        if depth < 1 or maxAddresses < 1:
+            raise ValueError("History depth and size must be at least 1")
+        if not 2 <= valueSize <= 0xff:
+            raise ValueError("Value size must be between 2 and 255")
+        self.__depth = depth
+        self.__maxAddresses = maxAddresses
+        self.__valueSize = valueSize
+        self.__rings = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__updates = 0
+        self.__evictions = 0
+
+    def __len__(self):
+        return len(self.__rings)
+
+    def __contains__(self, gaddrInt):
+        return gaddrInt in self.__rings
+
+    @property
+    def depth(self) -> int:
+        return self.__depth
+
+    @property
+    def maxAddresses(self) -> int:
+        return self.__maxAddresses
+
+    @property
+    def bytesPerAddress(self) -> int:
+        """
+        size of the columns allocated per group address
+        """
+        return self.__depth * (8 + 2 + 1 + self.__valueSize)
+
+    @property
+    def maxMemory(self) -> int:
+        """
+        upper bound of the column memory in bytes, reached when maxAddresses group addresses are active
+        """
+        return self.__maxAddresses * self.bytesPerAddress
+
+    def getStatistics(self) -> dict:
+        return {'size': len(self.__rings),
+                'maxAddresses': self.__maxAddresses,
+                'depth': self.__depth,
+                'memory': len(self.__rings) * self.bytesPerAddress,
+                'maxMemory': self.maxMemory,
+                'updates': self.__updates,
+                'evictions': self.__evictions}
+
+    def update(self, gaddrInt, srcAddr, raw, timestamp=None):
+        """
+        appends the value sent to a group address, overwriting its oldest value once the ring buffer is full
+        telegrams not carrying a value (group value read requests) are ignored
+        :param gaddrInt:    group address
+        :param srcAddr:     individual address of the sender
+        :param raw:         APDU as bytes, including the APCI bytes
+        :param timestamp:   time of reception as time.time(), now if not set
+        """
+        if len(raw) < 2 or not raw[1] & 0xC0:
+            return
+        size = min(len(raw), self.__valueSize)
+        with self.__lock:
+            ring = self.__rings.get(gaddrInt)
+            if ring is None:
+                if len(self.__rings) >= self.__maxAddresses:
+                    # reuse the columns of the evicted group address
+                    ring = self.__rings.popitem(last=False)[1]
+                    ring.next = ring.count = 0
+                    self.__evictions += 1
+                else:
+                    ring = _EIBHistoryRing(self.__depth, self.__valueSize)
+                self.__rings[gaddrInt] = ring
+            else:
+                self.__rings.move_to_end(gaddrInt)
+            i = ring.next
+            ring.timestamps[i] = time.time() if timestamp is None else timestamp
+            ring.srcAddrs[i] = srcAddr & 0xffff
+            ring.lengths[i] = size
+            offset = i * self.__valueSize
+            ring.values[offset:offset + size] = raw[:size]
+            ring.next = (i + 1) % self.__depth
+            if ring.count < self.__depth:
+                ring.count += 1
+            self.__updates += 1
+
+    def last(self, gaddrInt, n=None) -> list:
+        """
+        :param gaddrInt:    group address
+        :param n:           maximum number of values, None for all values kept
+        :return:            list of EIBCacheEntry, oldest value first
+        """
+        with self.__lock:
+            ring = self.__rings.get(gaddrInt)
+            if ring is None:
+                return []
+            count = ring.count if n is None else max(0, min(n, ring.count))
+            return self.__entries(ring, count)
+
+    def since(self, gaddrInt, timestamp) -> list:
+        """
+        :param gaddrInt:    group address
+        :param timestamp:   time as time.time(), values received before are skipped
+        :return:            list of EIBCacheEntry received at or after timestamp, oldest value first
+        """
+        with self.__lock:
+            ring = self.__rings.get(gaddrInt)
+            if ring is None:
+                return []
+            # values are appended in order of reception, count backwards from the latest value
+            count = 0
+            i = ring.next
+            while count < ring.count:
+                i = (i - 1) % self.__depth
+                if ring.timestamps[i] < timestamp:
+                    break
+                count += 1
+            return self.__entries(ring, count)
+
+    def __entries(self, ring, count):
+        """
+        copies the latest count values of the ring buffer, lock must be held
+        """
+        entries = []
+        valueSize = self.__valueSize
+        i = (ring.next - count) % self.__depth
+        for _ in range(count):
+            offset = i * valueSize
+            entries.append(EIBCacheEntry(ring.srcAddrs[i],
+                                         bytes(ring.values[offset:offset + ring.lengths[i]]),
+                                         ring.timestamps[i]))
+            i = (i + 1) % self.__depth
+        return entries
+
+    def remove(self, gaddrInt):
+        with self.__lock:
+            self.__rings.pop(gaddrInt, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__rings.clear()
@@ -0,0 +1,439 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import bisect
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import address
+
+# upper bounds of the histogram buckets in seconds, from 10us to 10s
+_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+            0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# names of the eibd request types, other types are reported by number
+_REQUEST_NAMES = {4: 'reset',
+                  38: 'open_group_socket',
+                  112: 'cache_enable',
+                  113: 'cache_disable',
+                  114: 'cache_clear',
+                  115: 'cache_remove',
+                  116: 'cache_read_sync',
+                  117: 'cache_read'}
+
+
+class EIBHistogram(object):
+    """
+    histogram with fixed bucket bounds, compatible with the Prometheus histogram type
+    """
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        # last bucket counts the values above the largest bound
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        """
+        estimates a quantile by linear interpolation within its bucket
+        :param q:   quantile between 0 and 1, e.g. 0.99
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulated = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulated + count >= rank:
+                lower = _BUCKETS[i - 1] if i > 0 else 0.0
+                upper = _BUCKETS[i] if i < len(_BUCKETS) else _BUCKETS[-1]
+                return lower + (upper - lower) * (rank - cumulated) / count
+            cumulated += count
+        return _BUCKETS[-1]
+
+    def copy(self):
+        h = EIBHistogram()
+        h.counts = list(self.counts)
+        h.sum = self.sum
+        h.count = self.count
+        return h
+
+    def getStatistics(self) -> dict:
+        return {'count': self.count,
+                'sum': self.sum,
+                'mean': self.sum / self.count if self.count else 0.0,
+                'p50': self.quantile(0.5),
+                'p99': self.quantile(0.99)}
+
+
+class EIBConnectionCounters(object):
+    """
+    traffic counters of one connection, only updated by the thread owning the connection
+    """
+    __slots__ = ('bytesIn', 'bytesOut', 'framesIn', 'framesOut')
+
+    def __init__(self):
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.framesIn = 0
+        self.framesOut = 0
+
+
+class EIBMonitorLineState(object):
+    """
+    connection state of the bus monitor to one daemon
+    """
+    __slots__ = ('connected', 'reconnects', 'downtime', 'telegramsLost', 'downSince')
+
+    def __init__(self):
+        self.connected = False
+        self.reconnects = 0
+        # seconds disconnected, excluding the current outage
+        self.downtime = 0.0
+        # estimated from the telegram rate before each outage
+        self.telegramsLost = 0.0
+        # time.monotonic() of the disconnect, None while connected
+        self.downSince = None
+
+    def getStatistics(self, now) -> dict:
+        return {'connected': self.connected,
+                'reconnects': self.reconnects,
+                'downtime': self.downtime + (now - self.downSince if self.downSince is not None else 0.0),
+                'telegramsLost': self.telegramsLost}
+
+
+class EIBMetrics(object):
+    """
+    Process wide metrics of the connections and the bus monitor
+    Hot paths only increment counters owned by their thread, which are summed up when a snapshot is taken.
+    Latencies of daemon requests and listener callbacks are kept in histograms.
+    Metrics are available as snapshot dict or in the Prometheus text format.
+    """
+    # reentrant, connections may be released by the garbage collector while the lock is held
+    __lock = threading.RLock()
+    # counters of open connections and totals of the connections already released
+    __connections = set()
+    __released = EIBConnectionCounters()
+    # telegrams per destination, one dict per monitor thread and totals of the dicts already released
+    __telegramCounts = []
+    __releasedTelegramCounts = {}
+    # request type -> EIBHistogram
+    __requests = {}
+    # listener class name -> EIBHistogram
+    __callbacks = {}
+    # name -> (help, function returning the current value)
+    __gauges = {}
+    # daemon port -> EIBMonitorLineState
+    __lines = {}
+    # telegram counts of the previous snapshot, the rates per destination are reported for the time in between
+    __lastTelegramCounts = {}
+    __lastSnapshot = time.monotonic()
+    __exporter = None
+
+    @staticmethod
+    def connectionCounters(connection) -> EIBConnectionCounters:
+        """
+        :param connection:  owner of the counters, counts are added to the totals once it is garbage collected
+        :return:            counters to be updated by the connection
+        """
+        counters = EIBConnectionCounters()
+        with EIBMetrics.__lock:
+            EIBMetrics.__connections.add(counters)
+        weakref.finalize(connection, EIBMetrics.__release, counters)
+        return counters
+
+    @staticmethod
+    def __release(counters):
+        with EIBMetrics.__lock:
+            released = EIBMetrics.__released
+            released.bytesIn += counters.bytesIn
+            released.bytesOut += counters.bytesOut
+            released.framesIn += counters.framesIn
+            released.framesOut += counters.framesOut
+            EIBMetrics.__connections.discard(counters)
+
+    @staticmethod
+    def telegramCounts() -> dict:
+        """
+        :return:    dict of group address to number of received telegrams, only updated by the calling monitor
+        """
+        counts = {}
+        with EIBMetrics.__lock:
+            EIBMetrics.__telegramCounts.append(counts)
+        return counts
+
+    @staticmethod
+    def releaseTelegramCounts(counts):
+        """
+        adds the counts of a monitor no longer receiving to the totals, the dict must not be updated afterwards
+        :param counts:  dict returned by telegramCounts
+        """
+        with EIBMetrics.__lock:
+            for i, c in enumerate(EIBMetrics.__telegramCounts):
+                if c is counts:
+                    del EIBMetrics.__telegramCounts[i]
+                    break
+            else:
+                return
+            released = EIBMetrics.__releasedTelegramCounts
+            for dest, count in counts.items():
+                released[dest] = released.get(dest, 0) + count
+
+    @staticmethod
+    def observeRequest(msgType, seconds):
+        """
+        :param msgType: eibd message type of the request
+        :param seconds: time from sending the request until its reply has been processed
+        """
+        with EIBMetrics.__lock:
+            histogram = EIBMetrics.__requests.get(msgType)
+            if histogram is None:
+                histogram = EIBMetrics.__requests[msgType] = EIBHistogram()
+            histogram.observe(seconds)
+
+    @staticmethod
+    def observeCallback(listener, seconds):
+        """
+        :param listener:    listener called, durations are kept per listener class
+        :param seconds:     duration of the callback
+        """
+        name = type(listener).__name__
+        with EIBMetrics.__lock:
+            histogram = EIBMetrics.__callbacks.get(name)
+            if histogram is None:
+                histogram = EIBMetrics.__callbacks[name] = EIBHistogram()
+            histogram.observe(seconds)
+
+    @staticmethod
+    def monitorConnected(port, rate=0.0):
+        """
+        :param port:    daemon the bus monitor (re)connected to
+        :param rate:    telegrams per second received before the outage, estimates the telegrams missed
+        """
+        with EIBMetrics.__lock:
+            line = EIBMetrics.__lines.get(port)
+            if line is None:
+                line = EIBMetrics.__lines[port] = EIBMonitorLineState()
+            if line.downSince is not None:
+                downtime = time.monotonic() - line.downSince
+                line.reconnects += 1
+                line.downtime += downtime
+                line.telegramsLost += rate * downtime
+                line.downSince = None
+            line.connected = True
+
+    @staticmethod
+    def monitorDisconnected(port):
+        """
+        :param port:    daemon the bus monitor lost its connection to resp. failed to connect to
+        """
+        with EIBMetrics.__lock:
+            line = EIBMetrics.__lines.get(port)
+            if line is None:
+                line = EIBMetrics.__lines[port] = EIBMonitorLineState()
+            if line.downSince is None:
+                line.downSince = time.monotonic()
+            line.connected = False
+
+    @staticmethod
+    def registerGauge(name, help, func):
+        """
+        :param name:    metric name, e.g. "eib_listener_queue_depth"
+        :param help:    description shown by the Prometheus exporter
+        :param func:    function returning the current value, called when metrics are collected
+        """
+        with EIBMetrics.__lock:
+            EIBMetrics.__gauges[name] = (help, func)
+
+    @staticmethod
+    def reset():
+        """
+        resets counters and histograms, gauges are kept
+        """
+        with EIBMetrics.__lock:
+            for counters in list(EIBMetrics.__connections) + [EIBMetrics.__released]:
+                counters.bytesIn = counters.bytesOut = counters.framesIn = counters.framesOut = 0
+            for counts in EIBMetrics.__telegramCounts:
+                counts.clear()
+            EIBMetrics.__releasedTelegramCounts = {}
+            EIBMetrics.__requests = {}
+            EIBMetrics.__callbacks = {}
+            for line in EIBMetrics.__lines.values():
+                line.reconnects = 0
+                line.downtime = 0.0
+                line.telegramsLost = 0.0
+                if line.downSince is not None:
+                    line.downSince = time.monotonic()
+            EIBMetrics.__lastTelegramCounts = {}
+            EIBMetrics.__lastSnapshot = time.monotonic()
+
+    @staticmethod
+    def __collect():
+        """
+        :return:    connection totals, telegram counts per group address, copies of the histograms,
+                    gauges, statistics of the monitor connections
+        """
+        with EIBMetrics.__lock:
+            traffic = EIBConnectionCounters()
+            for counters in list(EIBMetrics.__connections) + [EIBMetrics.__released]:
+                traffic.bytesIn += counters.bytesIn
+                traffic.bytesOut += counters.bytesOut
+                traffic.framesIn += counters.framesIn
+                traffic.framesOut += counters.framesOut
+            telegrams = {}
+            for counts in EIBMetrics.__telegramCounts + [EIBMetrics.__releasedTelegramCounts]:
+                for dest, count in counts.copy().items():
+                    telegrams[dest] = telegrams.get(dest, 0) + count
+            requests = {msgType: h.copy() for msgType, h in EIBMetrics.__requests.items()}
+            callbacks = {name: h.copy() for name, h in EIBMetrics.__callbacks.items()}
+            gauges = dict(EIBMetrics.__gauges)
+            now = time.monotonic()
+            lines = {port: line.getStatistics(now) for port, line in EIBMetrics.__lines.items()}
+        return traffic, telegrams, requests, callbacks, gauges, lines
+
+    @staticmethod
+    def snapshot() -> dict:
+        """
+        telegram rates per group address are calculated for the time since the previous snapshot
+        :return:    current metrics, durations in seconds
+        """
+        traffic, telegrams, requests, callbacks, gauges, lines = EIBMetrics.__collect()
+        now = time.monotonic()
+        with EIBMetrics.__lock:
+            interval = now - EIBMetrics.__lastSnapshot
+            last = EIBMetrics.__lastTelegramCounts
+            EIBMetrics.__lastTelegramCounts = telegrams
+            EIBMetrics.__lastSnapshot = now
+        rates = {}
+        if interval > 0:
+            for dest, count in telegrams.items():
+                if count != last.get(dest, 0):
+                    rates[address.printGroupSlash(dest)] = (count - last.get(dest, 0)) / interval
+        return {'bytesIn': traffic.bytesIn,
+                'bytesOut': traffic.bytesOut,
+                'framesIn': traffic.framesIn,
+                'framesOut': traffic.framesOut,
+                'telegrams': sum(telegrams.values()),
+                'telegramsPerSec': rates,
+                'interval': interval,
+                'requests': {_REQUEST_NAMES.get(t, str(t)): h.getStatistics() for t, h in requests.items()},
+                'callbacks': {name: h.getStatistics() for name, h in callbacks.items()},
+                'monitor': lines,
+                'gauges': {name: func() for name, (help, func) in gauges.items()}}
+
+    @staticmethod
+    def toPrometheus() -> str:
+        """
+        :return:    current metrics in the Prometheus text exposition format
+        """
+        traffic, telegrams, requests, callbacks, gauges, monitorLines = EIBMetrics.__collect()
+        lines = []
+
+        def header(name, kind, help):
+            lines.append("# HELP %s %s" % (name, help))
+            lines.append("# TYPE %s %s" % (name, kind))
+
+        def histogram(name, label, value, h):
+            cumulated = 0
+            for bound, count in zip(_BUCKETS, h.counts):
+                cumulated += count
+                lines.append('%s_bucket{%s="%s",le="%g"} %d' % (name, label, value, bound, cumulated))
+            lines.append('%s_bucket{%s="%s",le="+Inf"} %d' % (name, label, value, h.count))
+            lines.append('%s_sum{%s="%s"} %r' % (name, label, value, h.sum))
+            lines.append('%s_count{%s="%s"} %d' % (name, label, value, h.count))
+
+        header("eib_bytes_total", "counter", "Bytes sent to resp. received from the daemon")
+        lines.append('eib_bytes_total{direction="in"} %d' % traffic.bytesIn)
+        lines.append('eib_bytes_total{direction="out"} %d' % traffic.bytesOut)
+        header("eib_frames_total", "counter", "Frames sent to resp. received from the daemon")
+        lines.append('eib_frames_total{direction="in"} %d' % traffic.framesIn)
+        lines.append('eib_frames_total{direction="out"} %d' % traffic.framesOut)
+        header("eib_telegrams_total", "counter", "Group telegrams received by the bus monitor")
+        for dest in sorted(telegrams):
+            lines.append('eib_telegrams_total{dest="%s"} %d' % (address.printGroupSlash(dest), telegrams[dest]))
+        header("eib_request_duration_seconds", "histogram", "Time from sending a request until its reply")
+        for msgType in sorted(requests):
+            histogram("eib_request_duration_seconds", "type", _REQUEST_NAMES.get(msgType, str(msgType)),
+                      requests[msgType])
+        header("eib_listener_callback_duration_seconds", "histogram", "Duration of the listener callbacks")
+        for name in sorted(callbacks):
+            histogram("eib_listener_callback_duration_seconds", "listener", name, callbacks[name])
+        for name, kind, key, help in (
+                ("eib_monitor_connected", "gauge", 'connected', "Bus monitor connected to the daemon"),
+                ("eib_monitor_reconnects_total", "counter", 'reconnects', "Reconnects of the bus monitor"),
+                ("eib_monitor_downtime_seconds_total", "counter", 'downtime', "Time the bus monitor was disconnected"),
+                ("eib_monitor_telegrams_lost_total", "counter", 'telegramsLost',
+                 "Telegrams missed while disconnected, estimated from the rate before the outage")):
+            header(name, kind, help)
+            for port in sorted(monitorLines):
+                lines.append('%s{daemon="%s"} %r' % (name, port, float(monitorLines[port][key])))
+        for name in sorted(gauges):
+            help, func = gauges[name]
+            header(name, "gauge", help)
+            lines.append("%s %r" % (name, func()))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def startExporter(port=9108, host=''):
+        """
+        serves the metrics for Prometheus on http://host:port/metrics from a background thread
+        :return:    HTTP server, stopped by stopExporter
+        """
+        with EIBMetrics.__lock:
+            if EIBMetrics.__exporter is None:
+                server = ThreadingHTTPServer((host, port), _EIBMetricsHandler)
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="EIBMetricsExporter", daemon=True).start()
+                EIBMetrics.__exporter = server
+            return EIBMetrics.__exporter
+
+    @staticmethod
+    def stopExporter():
+        with EIBMetrics.__lock:
+            server = EIBMetrics.__exporter
+            EIBMetrics.__exporter = None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+class _EIBMetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = EIBMetrics.toPrometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
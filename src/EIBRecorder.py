@@ -0,0 +1,324 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import array
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+
+from EIBConnection import Telegram
+
+# file layout
+#   data file:  magic, followed by records of a fixed size header and the APDU
+#   index file: magic, followed by (timestamp, offset) of every indexInterval-th record of the data file
+_DATA_MAGIC = b'EIBREC\x00\x01'
+_INDEX_MAGIC = b'EIBIDX\x00\x01'
+# timestamp as time.time(), source address, destination address, APDU length
+_RECORD_HEADER = struct.Struct('<dHHB')
+_INDEX_ENTRY = struct.Struct('<dQ')
+_INDEX_SUFFIX = '.idx'
+
+
+def _openAppend(path, magic):
+    """
+    opens a file for appending, writes the magic to new files and verifies it for existing ones
+    """
+    f = open(path, 'ab')
+    if f.tell() == 0:
+        f.write(magic)
+    else:
+        with open(path, 'rb') as r:
+            if r.read(len(magic)) != magic:
+                f.close()
+                raise ValueError("Not a telegram recording - {0}".format(path))
+    return f
+
+
+def _recover(path):
+    """
+    truncates an incomplete record left by an interrupted recording, so further records can be appended
+    index entries pointing behind the end of the data are dropped as well
+    """
+    indexPath = path + _INDEX_SUFFIX
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    offset = len(_DATA_MAGIC)
+    if os.path.exists(indexPath):
+        with open(indexPath, 'rb') as f:
+            data = f.read()
+        entries = (len(data) - len(_INDEX_MAGIC)) // _INDEX_ENTRY.size
+        valid = 0
+        for i in range(entries):
+            entryOffset = _INDEX_ENTRY.unpack_from(data, len(_INDEX_MAGIC) + i * _INDEX_ENTRY.size)[1]
+            if entryOffset >= size:
+                break
+            offset = entryOffset
+            valid = i + 1
+        if len(data) > len(_INDEX_MAGIC) and len(data) != len(_INDEX_MAGIC) + valid * _INDEX_ENTRY.size:
+            with open(indexPath, 'r+b') as f:
+                f.truncate(len(_INDEX_MAGIC) + valid * _INDEX_ENTRY.size)
+    if size <= offset:
+        return
+    # walk the records following the last valid index entry
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = 0
+    while end + _RECORD_HEADER.size <= len(data):
+        length = data[end + _RECORD_HEADER.size - 1]
+        if end + _RECORD_HEADER.size + length > len(data):
+            break
+        end += _RECORD_HEADER.size + length
+    if offset + end < size:
+        with open(path, 'r+b') as f:
+            f.truncate(offset + end)
+
+
+class EIBRecorder(object):
+    """
+    Append-only binary log of group telegrams
+    Records are collected in memory and written in batches, each batch is synced to disk with a single fsync.
+    A sparse index of the record timestamps is kept in a separate file, so readers can seek by time.
+    """
+
+    def __init__(self, path, flushInterval=1.0, bufferSize=1 << 16, indexInterval=1024):
+        """
+        :param path:            data file, appended to if existing, the index is kept in path + ".idx"
+        :param flushInterval:   maximum seconds records are buffered before being written and synced,
+                                also applies to idle lines via a timer armed by the first buffered record
+        :param bufferSize:      buffered bytes triggering a write before flushInterval has elapsed
+        :param indexInterval:   number of records between two index entries
+        """
+        self.__path = path
+        self.__flushInterval = flushInterval
+        self.__bufferSize = bufferSize
+        self.__indexInterval = indexInterval
+        _recover(path)
+        self.__data = _openAppend(path, _DATA_MAGIC)
+        try:
+            self.__index = _openAppend(path + _INDEX_SUFFIX, _INDEX_MAGIC)
+        except ValueError:
+            self.__data.close()
+            raise
+        self.__offset = self.__data.tell()
+        self.__buffer = bytearray()
+        self.__indexBuffer = bytearray()
+        self.__sinceIndex = indexInterval
+        self.__lock = threading.Lock()
+        self.__nextFlush = time.monotonic() + flushInterval
+        # flushes buffered records if no further record arrives before the deadline
+        self.__timer = None
+        # telegram timestamps are monotonic, recorded timestamps are converted to wall clock time
+        self.__clockOffset = time.time() - time.monotonic()
+        self.__records = 0
+        self.__syncs = 0
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def recordCount(self) -> int:
+        """
+        number of records added since the recorder has been opened
+        """
+        return self.__records
+
+    @property
+    def syncCount(self) -> int:
+        return self.__syncs
+
+    def record(self, telegram):
+        """
+        :param telegram:    Telegram as returned by EIBGetGroupTelegram
+        """
+        self.write(telegram.src, telegram.dest, telegram.payload, telegram.timestamp + self.__clockOffset)
+
+    def write(self, srcAddr, destAddr, raw, timestamp=None):
+        """
+        appends a group telegram
+        :param srcAddr:     individual address of the sender
+        :param destAddr:    group address
+        :param raw:         APDU as bytes including TPCI/APCI, at most 255 bytes
+        :param timestamp:   time of reception as time.time(), now if not set
+        """
+        if len(raw) > 0xff:
+            raise ValueError("APDU too long for recording - {0} bytes".format(len(raw)))
+        if timestamp is None:
+            timestamp = time.time()
+        with self.__lock:
+            if self.__data is None:
+                raise ValueError("Recorder is closed")
+            if self.__sinceIndex >= self.__indexInterval:
+                self.__indexBuffer += _INDEX_ENTRY.pack(timestamp, self.__offset + len(self.__buffer))
+                self.__sinceIndex = 0
+            self.__sinceIndex += 1
+            self.__buffer += _RECORD_HEADER.pack(timestamp, srcAddr, destAddr, len(raw))
+            self.__buffer += raw
+            self.__records += 1
+            if len(self.__buffer) >= self.__bufferSize or time.monotonic() >= self.__nextFlush:
+                self.__flush()
+            elif self.__timer is None:
+                self.__timer = threading.Timer(max(0.0, self.__nextFlush - time.monotonic()), self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self):
+        """
+        writes and syncs all buffered records
+        """
+        with self.__lock:
+            if self.__data is not None:
+                self.__flush()
+
+    def __flush(self):
+        self.__nextFlush = time.monotonic() + self.__flushInterval
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if not self.__buffer:
+            return
+        # data is synced before the index, index entries never point behind the synced data
+        self.__data.write(self.__buffer)
+        self.__data.flush()
+        os.fsync(self.__data.fileno())
+        self.__offset += len(self.__buffer)
+        self.__buffer = bytearray()
+        if self.__indexBuffer:
+            self.__index.write(self.__indexBuffer)
+            self.__index.flush()
+            os.fsync(self.__index.fileno())
+            self.__indexBuffer = bytearray()
+        self.__syncs += 1
+
+    def close(self):
+        with self.__lock:
+            if self.__data is None:
+                return
+            self.__flush()
+            self.__data.close()
+            self.__index.close()
+            self.__data = None
+            self.__index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class EIBRecordReader(object):
+    """
+    Reader of a telegram recording written by EIBRecorder
+    The data file is memory-mapped, time ranges are located via binary search on the sparse index
+    and only the records within the range are parsed.
+    Records are returned as Telegram with timestamp as recorded (time.time()).
+    """
+
+    def __init__(self, path):
+        """
+        :param path:    data file of the recording
+        """
+        self.__path = path
+        self.__file = open(path, 'rb')
+        size = os.fstat(self.__file.fileno()).st_size
+        if size < len(_DATA_MAGIC):
+            self.__file.close()
+            raise ValueError("Not a telegram recording - {0}".format(path))
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__map[:len(_DATA_MAGIC)] != _DATA_MAGIC:
+            self.close()
+            raise ValueError("Not a telegram recording - {0}".format(path))
+        self.__size = size
+
+        # timestamps and offsets of the index entries, recording is still readable without index
+        self.__indexTimes = array.array('d')
+        self.__indexOffsets = []
+        try:
+            with open(path + _INDEX_SUFFIX, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        if data[:len(_INDEX_MAGIC)] == _INDEX_MAGIC:
+            end = len(_INDEX_MAGIC) + (len(data) - len(_INDEX_MAGIC)) // _INDEX_ENTRY.size * _INDEX_ENTRY.size
+            for timestamp, offset in _INDEX_ENTRY.iter_unpack(data[len(_INDEX_MAGIC):end]):
+                if offset < size:
+                    self.__indexTimes.append(timestamp)
+                    self.__indexOffsets.append(offset)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __iter__(self):
+        return self.read()
+
+    def read(self, start=None, end=None):
+        """
+        iterates the records received within a time range
+        :param start:   time as time.time(), records before are skipped, None to start with the first record
+        :param end:     time as time.time(), records after are skipped, None to read until the last record
+        :return:        generator of Telegram in order of recording
+        """
+        offset = self.__seek(start) if start is not None else len(_DATA_MAGIC)
+        m = self.__map
+        size = self.__size
+        headerSize = _RECORD_HEADER.size
+        unpack = _RECORD_HEADER.unpack_from
+        while offset + headerSize <= size:
+            timestamp, src, dest, length = unpack(m, offset)
+            payloadStart = offset + headerSize
+            offset = payloadStart + length
+            if offset > size:
+                # incomplete record of an interrupted recording
+                break
+            if end is not None and timestamp > end:
+                break
+            if start is not None and timestamp < start:
+                continue
+            raw = m[payloadStart:offset]
+            apci = ((raw[0] & 0x03) << 8) | (raw[1] & 0xC0) if length >= 2 else 0
+            yield Telegram(src, dest, apci, raw, timestamp)
+
+    def __seek(self, start):
+        """
+        :return:    offset of the last indexed record received before start
+        """
+        i = bisect.bisect_left(self.__indexTimes, start)
+        return self.__indexOffsets[i - 1] if i > 0 else len(_DATA_MAGIC)
+
+    def close(self):
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
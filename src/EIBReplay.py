@@ -0,0 +1,191 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import array
+import threading
+import time
+
+from EIBClient import EIBClientListener, EIBListenerIndex, _EIBClientMonitor
+from EIBRecorder import EIBRecordReader
+
+# sleeping for shorter periods is not precise, telegrams due within this time are dispatched right away
+_MIN_SLEEP = 0.001
+
+
+class _EIBCallbackTimer(object):
+    """
+    measures the callbacks of one listener by temporarily shadowing its callback methods
+    """
+
+    def __init__(self, listener):
+        self.listener = listener
+        self.durations = array.array('d')
+        self.errors = 0
+        self.active = 0
+        self.__lock = threading.Lock()
+        updateOccurred = listener.updateOccurred
+        updateOccurredBatch = listener.updateOccurredBatch
+
+        def timedUpdateOccurred(srcAddr, val):
+            return self.__measure(updateOccurred, srcAddr, val)
+
+        def timedUpdateOccurredBatch(updates):
+            return self.__measure(updateOccurredBatch, updates)
+
+        listener.updateOccurred = timedUpdateOccurred
+        # default batch implementation calls updateOccurred, only batch implementations of the listener are timed
+        if type(listener).updateOccurredBatch is not EIBClientListener.updateOccurredBatch:
+            listener.updateOccurredBatch = timedUpdateOccurredBatch
+
+    def __measure(self, callback, *args):
+        with self.__lock:
+            self.active += 1
+        start = time.perf_counter()
+        try:
+            return callback(*args)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with self.__lock:
+                self.durations.append(duration)
+                self.active -= 1
+
+    def restore(self):
+        self.listener.__dict__.pop('updateOccurred', None)
+        self.listener.__dict__.pop('updateOccurredBatch', None)
+
+    def getStatistics(self) -> dict:
+        durations = sorted(self.durations)
+        count = len(durations)
+        return {'listener': self.listener.getGoupAddressText(),
+                'calls': count,
+                'errors': self.errors,
+                'mean': sum(durations) / count if count else 0.0,
+                'p50': durations[count // 2] if count else 0.0,
+                'p99': durations[min(count - 1, int(count * 0.99))] if count else 0.0,
+                'max': durations[-1] if count else 0.0}
+
+
+class EIBReplay(object):
+    """
+    Replays recorded telegrams into the registered listeners without a bus connection
+    Telegrams are handed to the dispatch path of the bus monitor, so listeners are called exactly as for live
+    traffic, including a configured EIBDispatcher and batch delivery.
+    """
+
+    def __init__(self, source, listeners=None):
+        """
+        :param source:      path of a recording written by EIBRecorder or iterable of Telegram in order of reception
+        :param listeners:   listeners receiving the replayed telegrams only, neither the listeners registered at the
+                            EIBClientFactory nor live telegrams of the bus monitor reach them,
+                            None to replay into the listeners registered at the EIBClientFactory
+        """
+        self.__source = source
+        self.__listeners = list(listeners) if listeners is not None else None
+
+    def run(self, speed=1.0, start=None, end=None, drainTimeout=10.0) -> dict:
+        """
+        replays the telegrams and waits until all callbacks have completed
+        :param speed:           replay speed relative to recording, e.g. 1.0 or 10.0, None or 0 for maximum speed
+        :param start:           time as time.time(), recorded telegrams before are skipped
+        :param end:             time as time.time(), recorded telegrams after are skipped
+        :param drainTimeout:    maximum seconds to wait for queued callbacks after the last telegram
+        :return:                statistics with telegrams/sec dispatched resp. completed by all callbacks,
+                                maximum lag behind schedule and callback durations in seconds per listener
+        """
+        index = None
+        if self.__listeners is not None:
+            # private index, the replay must not reach the listeners registered at the monitor and vice versa
+            index = EIBListenerIndex()
+            listeners = [rl for rl in self.__listeners if index.add(rl)]
+        else:
+            listeners = _EIBClientMonitor.getListeners()
+        timers = [_EIBCallbackTimer(rl) for rl in listeners]
+
+        reader = None
+        source = self.__source
+        if isinstance(source, str):
+            reader = source = EIBRecordReader(source)
+        try:
+            if reader is not None:
+                telegrams = reader.read(start, end)
+            else:
+                telegrams = (t for t in source
+                             if (start is None or t.timestamp >= start) and (end is None or t.timestamp <= end))
+            started = time.perf_counter()
+            count, lag = self.__replay(telegrams, speed, started, index)
+            dispatched = time.perf_counter()
+            self.__drain(timers, drainTimeout)
+            completed = time.perf_counter()
+        finally:
+            for timer in timers:
+                timer.restore()
+            if reader is not None:
+                reader.close()
+
+        return {'telegrams': count,
+                'speed': speed or None,
+                'seconds': completed - started,
+                'telegramsPerSec': count / (dispatched - started) if dispatched > started else 0.0,
+                'completedPerSec': count / (completed - started) if completed > started else 0.0,
+                'maxLag': lag,
+                'listeners': [timer.getStatistics() for timer in timers]}
+
+    @staticmethod
+    def __replay(telegrams, speed, started, index):
+        """
+        :param started: start of the replay as time.perf_counter()
+        :param index:   EIBListenerIndex of the listeners to replay into, listeners registered at the monitor if None
+        :return:        number of telegrams, maximum lag behind schedule in seconds
+        """
+        dispatch = _EIBClientMonitor.dispatch
+        count = 0
+        lag = 0.0
+        first = None
+        for telegram in telegrams:
+            if speed:
+                if first is None:
+                    first = telegram.timestamp
+                due = started + (telegram.timestamp - first) / speed
+                delay = due - time.perf_counter()
+                if delay > _MIN_SLEEP:
+                    time.sleep(delay)
+                elif -delay > lag:
+                    lag = -delay
+            dispatch(telegram, index)
+            count += 1
+        return count, lag
+
+    @staticmethod
+    def __drain(timers, timeout):
+        """
+        waits until queued and running callbacks have completed
+        """
+        deadline = time.perf_counter() + timeout
+        idle = 0
+        while idle < 2 and time.perf_counter() < deadline:
+            if _EIBClientMonitor.getPendingCount() or any(timer.active for timer in timers):
+                idle = 0
+            else:
+                idle += 1
+            time.sleep(_MIN_SLEEP)
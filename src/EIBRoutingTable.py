@@ -0,0 +1,130 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import threading
+
+from address import printGroupSlash, readgaddr
+
+
+class EIBRoutingTable(object):
+    """
+    Maps group address ranges to the daemons serving them, e.g. one knxd per building line
+    Ranges must not overlap, group addresses not covered by a range are routed to the default daemon.
+    """
+
+    def __init__(self, default=None):
+        """
+        :param default: socket path or host[:port] of the daemon serving group addresses not covered by a range,
+                        None to reject them
+        """
+        self.__default = default
+        # (first, last, port) sorted by first group address
+        self.__ranges = []
+        # group address -> port, built on first lookup
+        self.__table = None
+        self.__masks = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def default(self):
+        return self.__default
+
+    @property
+    def ports(self) -> list:
+        """
+        all daemons of the routing table, in order of their first group address, default daemon last
+        """
+        ports = []
+        for first, last, port in self.__ranges:
+            if port not in ports:
+                ports.append(port)
+        if self.__default is not None and self.__default not in ports:
+            ports.append(self.__default)
+        return ports
+
+    def getRanges(self) -> list:
+        """
+        :return:    list of tuples (first group address, last group address, port), group addresses as text
+        """
+        return [(printGroupSlash(first), printGroupSlash(last), port) for first, last, port in self.__ranges]
+
+    def add(self, first, last, port):
+        """
+        routes a range of group addresses to a daemon
+        :param first:   first group address of the range, "1/0/0" or int
+        :param last:    last group address of the range, "1/7/255" or int
+        :param port:    socket path or host[:port] of the daemon
+        :raises:        ValueError if the range is empty or overlaps with a range already added
+        """
+        first = readgaddr(first) if isinstance(first, str) else first
+        last = readgaddr(last) if isinstance(last, str) else last
+        if not 0 <= first <= last <= 0xffff:
+            raise ValueError("Invalid group address range - {0} to {1}".format(
+                printGroupSlash(first & 0xffff), printGroupSlash(last & 0xffff)))
+        with self.__lock:
+            for f, l, p in self.__ranges:
+                if first <= l and f <= last:
+                    raise ValueError("Group address range {0} to {1} overlaps with {2} to {3}".format(
+                        printGroupSlash(first), printGroupSlash(last), printGroupSlash(f), printGroupSlash(l)))
+            self.__ranges.append((first, last, port))
+            self.__ranges.sort()
+            self.__table = None
+            self.__masks = {}
+        return self
+
+    def addMainGroup(self, main, port):
+        """
+        routes all group addresses of a main group to a daemon
+        :param main:    main group 0 to 31
+        :param port:    socket path or host[:port] of the daemon
+        """
+        return self.add((main & 0x1f) << 11, ((main & 0x1f) << 11) | 0x7ff, port)
+
+    def __getTable(self) -> list:
+        table = self.__table
+        if table is None:
+            with self.__lock:
+                table = [self.__default] * 0x10000
+                for first, last, port in self.__ranges:
+                    table[first:last + 1] = [port] * (last - first + 1)
+                self.__table = table
+        return table
+
+    def route(self, gaddrInt):
+        """
+        :param gaddrInt:    group address
+        :return:            port of the daemon serving the group address
+        :raises:            ValueError if the group address is not routed
+        """
+        port = self.__getTable()[gaddrInt & 0xffff]
+        if port is None:
+            raise ValueError("No daemon routed for group address - {0}".format(printGroupSlash(gaddrInt & 0xffff)))
+        return port
+
+    def getMask(self, port) -> bytearray:
+        """
+        :return:    table with one entry per group address, 1 if routed to port, 0 otherwise
+        """
+        mask = self.__masks.get(port)
+        if mask is None:
+            mask = bytearray(p == port for p in self.__getTable())
+            self.__masks[port] = mask
+        return mask
@@ -0,0 +1,441 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import collections
+import errno
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+
+# eibd message types served by the stand-in
+_EIB_RESET_CONNECTION = 4
+_EIB_INVALID_REQUEST = 6
+_EIB_OPEN_GROUPCON = 38
+_EIB_GROUP_PACKET = 39
+_EIB_CACHE_ENABLE = 112
+_EIB_CACHE_DISABLE = 113
+_EIB_CACHE_CLEAR = 114
+_EIB_CACHE_REMOVE = 115
+_EIB_CACHE_READ_SYNC = 116
+_EIB_CACHE_READ = 117
+
+_FRAME_HEADER = struct.Struct('>H')
+_TYPE = struct.Struct('>H')
+_GROUP_PACKET = struct.Struct('>HHHH')
+_CACHE_REPLY = struct.Struct('>HHH')
+
+# resolution of the telegram generator, telegrams due within one tick are sent with a single write
+_GENERATOR_TICK = 0.001
+
+
+def _counterPayload(i):
+    """
+    default payload of generated telegrams, DPT 9 value counting up
+    """
+    return bytes((0x00, 0x80, 0x0c, i & 0xff))
+
+
+class _EIBStandInHandler(socketserver.BaseRequestHandler):
+    """
+    serves one client connection
+    """
+
+    def setup(self):
+        self.sendLock = threading.Lock()
+        self.groupSocket = False
+        self.writeOnly = False
+
+    def handle(self):
+        standIn = self.server.standIn
+        standIn._connect(self)
+        sock = self.request
+        buf = bytearray()
+        try:
+            while True:
+                data = sock.recv(1 << 16)
+                if not data:
+                    break
+                buf += data
+                offset = 0
+                while len(buf) - offset >= 2:
+                    length = _FRAME_HEADER.unpack_from(buf, offset)[0]
+                    if len(buf) - offset - 2 < length:
+                        break
+                    frame = bytes(buf[offset + 2:offset + 2 + length])
+                    offset += 2 + length
+                    standIn._handle(self, frame)
+                del buf[:offset]
+        except OSError:
+            pass
+        finally:
+            standIn._disconnect(self)
+
+    def send(self, data):
+        """
+        :param data:    one or multiple complete frames
+        """
+        with self.sendLock:
+            try:
+                self.request.sendall(data)
+            except OSError:
+                pass
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class EIBStandInDaemon(object):
+    """
+    Pure Python stand-in for knxd speaking the eibd protocol, for tests and benchmarks without daemon and bus
+    Supports group sockets receiving generated or pushed telegrams, EIBSendGroup, the group cache
+    (EIB_Cache_Read, EIB_Cache_Read_Sync, enable, disable, clear, remove) and connection reset.
+    Group telegrams are generated at a configurable rate, replies are delayed by a configurable latency.
+    """
+
+    def __init__(self, path=None, host='127.0.0.1', port=0, rate=0.0, latency=0.0, addresses=None,
+                 payload=_counterPayload, srcAddr=0x1101, ownAddr=0x11ff):
+        """
+        :param path:        Unix socket path, None to listen on TCP
+        :param host:        TCP host to listen on
+        :param port:        TCP port to listen on, 0 for any free port
+        :param rate:        telegrams per second generated to all group sockets, 0 to only send pushed telegrams
+        :param latency:     seconds each reply is delayed, simulating a slow daemon or bus
+        :param addresses:   group addresses as int the generated telegrams are sent to in turn,
+                            None for 1/0/0 to 1/0/255
+        :param payload:     function returning the APDU of the i-th generated telegram
+        :param srcAddr:     individual address of the sender of generated and pushed telegrams
+        :param ownAddr:     individual address of the daemon, sender of telegrams written by clients
+        """
+        self.__path = path
+        self.__host = host
+        self.__requestedPort = port
+        self.__rate = rate
+        self.__latency = latency
+        self.__addresses = list(addresses) if addresses is not None else list(range(0x0800, 0x0900))
+        self.__payload = payload
+        self.__srcAddr = srcAddr
+        self.__ownAddr = ownAddr
+        self.__server = None
+        # inode of the socket file bound, only this socket is removed on stop
+        self.__inode = None
+        self.__generator = None
+        self.__running = threading.Event()
+        self.__lock = threading.Lock()
+        self.__connections = set()
+        self.__cache = {}
+        self.__cacheEnabled = True
+        self.__writes = collections.deque(maxlen=10000)
+        self.__framesReceived = 0
+        self.__framesSent = 0
+        self.__telegramsPushed = 0
+        self.__groupWrites = 0
+
+    @property
+    def port(self) -> str:
+        """
+        port to be passed to EIBClient.setEIBConnection resp. EIBClientFactory, Unix socket path or host:port
+        """
+        if self.__path is not None:
+            return self.__path
+        return "{0}:{1}".format(*self.__server.server_address[:2])
+
+    @property
+    def url(self) -> str:
+        """
+        url to be passed to EIBConnection.EIBSocketURL
+        """
+        if self.__path is not None:
+            return "local:" + self.__path
+        return "ip:" + self.port
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    @rate.setter
+    def rate(self, rate):
+        self.__rate = rate
+
+    @property
+    def latency(self) -> float:
+        return self.__latency
+
+    @latency.setter
+    def latency(self, latency):
+        self.__latency = latency
+
+    @property
+    def writes(self) -> list:
+        """
+        latest telegrams written by clients as tuples (destAddr, APDU), oldest first
+        """
+        with self.__lock:
+            return list(self.__writes)
+
+    def getStatistics(self) -> dict:
+        with self.__lock:
+            return {'connections': len(self.__connections),
+                    'framesReceived': self.__framesReceived,
+                    'framesSent': self.__framesSent,
+                    'telegramsPushed': self.__telegramsPushed,
+                    'groupWrites': self.__groupWrites}
+
+    def start(self):
+        """
+        starts listening, returns once clients can connect
+        :raises:    OSError if the socket path is served by a running daemon or is not a socket
+        """
+        if self.__server is not None:
+            return self
+        if self.__path is not None:
+            self.__removeStaleSocket()
+            server = _UnixServer(self.__path, _EIBStandInHandler)
+            self.__inode = os.stat(self.__path).st_ino
+        else:
+            server = _TCPServer((self.__host, self.__requestedPort), _EIBStandInHandler)
+        server.standIn = self
+        self.__server = server
+        self.__running.set()
+        threading.Thread(target=server.serve_forever, name="EIBStandInDaemon", daemon=True).start()
+        self.__generator = threading.Thread(target=self.__generate, name="EIBStandInGenerator", daemon=True)
+        self.__generator.start()
+        return self
+
+    def stop(self):
+        """
+        stops listening and closes all client connections
+        """
+        server = self.__server
+        if server is None:
+            return
+        self.__running.clear()
+        server.shutdown()
+        server.server_close()
+        with self.__lock:
+            connections = list(self.__connections)
+        for handler in connections:
+            try:
+                handler.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.__generator.join()
+        self.__server = None
+        try:
+            if self.__inode is not None and os.stat(self.__path).st_ino == self.__inode:
+                os.unlink(self.__path)
+        except FileNotFoundError:
+            pass
+        self.__inode = None
+
+    def __removeStaleSocket(self):
+        """
+        removes the socket file left by a daemon no longer running, e.g. after a crash
+        """
+        try:
+            mode = os.stat(self.__path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(errno.EEXIST, "Not a socket", self.__path)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.__path)
+        except ConnectionRefusedError:
+            os.unlink(self.__path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, "Socket in use by a running daemon", self.__path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def setValue(self, destAddr, raw, srcAddr=None):
+        """
+        stores a value in the group cache without sending a telegram
+        :param destAddr:    group address as int
+        :param raw:         APDU including TPCI/APCI
+        :param srcAddr:     individual address of the sender, srcAddr of the daemon if not set
+        """
+        with self.__lock:
+            self.__cache[destAddr] = (self.__srcAddr if srcAddr is None else srcAddr, bytes(raw))
+
+    def push(self, destAddr, raw, srcAddr=None):
+        """
+        sends a group telegram to all group sockets and updates the group cache
+        :param destAddr:    group address as int
+        :param raw:         APDU including TPCI/APCI
+        :param srcAddr:     individual address of the sender, srcAddr of the daemon if not set
+        """
+        self.__broadcast([(self.__srcAddr if srcAddr is None else srcAddr, destAddr, bytes(raw))])
+
+    def pushMany(self, telegrams, srcAddr=None):
+        """
+        sends multiple group telegrams with a single write per group socket
+        :param telegrams:   iterable of tuples (group address as int, APDU including TPCI/APCI)
+        :param srcAddr:     individual address of the sender, srcAddr of the daemon if not set
+        """
+        src = self.__srcAddr if srcAddr is None else srcAddr
+        self.__broadcast([(src, destAddr, bytes(raw)) for destAddr, raw in telegrams])
+
+    def __broadcast(self, telegrams, sender=None):
+        """
+        sends telegrams to all group sockets except the sender with a single write per connection
+        """
+        frames = b''.join(_GROUP_PACKET.pack(6 + len(raw), _EIB_GROUP_PACKET, src, dest) + raw
+                          for src, dest, raw in telegrams)
+        with self.__lock:
+            for src, dest, raw in telegrams:
+                if len(raw) >= 2 and raw[1] & 0xC0:
+                    self.__cache[dest] = (src, raw)
+            receivers = [h for h in self.__connections if h.groupSocket and not h.writeOnly and h is not sender]
+            self.__telegramsPushed += len(telegrams)
+            self.__framesSent += len(telegrams) * len(receivers)
+        for handler in receivers:
+            handler.send(frames)
+
+    def __generate(self):
+        """
+        sends generated telegrams at the configured rate, due telegrams are sent in batches
+        """
+        i = 0
+        rate = None
+        while self.__running.is_set():
+            if self.__rate <= 0:
+                rate = None
+                time.sleep(_GENERATOR_TICK * 10)
+                continue
+            if rate != self.__rate:
+                # (re)start the schedule on rate changes
+                rate = self.__rate
+                started = time.monotonic()
+                sent = 0
+            due = int((time.monotonic() - started) * rate) - sent
+            if due > 0:
+                batch = []
+                for _ in range(min(due, 10000)):
+                    batch.append((self.__srcAddr, self.__addresses[i % len(self.__addresses)], self.__payload(i)))
+                    i += 1
+                self.__broadcast(batch)
+                sent += len(batch)
+            else:
+                time.sleep(_GENERATOR_TICK)
+
+    def _connect(self, handler):
+        with self.__lock:
+            self.__connections.add(handler)
+
+    def _disconnect(self, handler):
+        with self.__lock:
+            self.__connections.discard(handler)
+
+    def _handle(self, handler, frame):
+        """
+        processes one request frame of a client
+        """
+        with self.__lock:
+            self.__framesReceived += 1
+        if len(frame) < 2:
+            return
+        msgType = _TYPE.unpack_from(frame)[0]
+
+        if msgType == _EIB_GROUP_PACKET:
+            # group telegrams are not answered
+            if handler.groupSocket and len(frame) >= 6:
+                dest = _TYPE.unpack_from(frame, 2)[0]
+                raw = frame[4:]
+                with self.__lock:
+                    self.__groupWrites += 1
+                    self.__writes.append((dest, raw))
+                self.__broadcast([(self.__ownAddr, dest, raw)], handler)
+            return
+
+        if self.__latency > 0:
+            time.sleep(self.__latency)
+
+        if msgType == _EIB_OPEN_GROUPCON and not handler.groupSocket:
+            handler.writeOnly = len(frame) >= 5 and frame[4] != 0
+            handler.groupSocket = True
+            reply = _TYPE.pack(msgType)
+        elif msgType == _EIB_RESET_CONNECTION:
+            handler.groupSocket = False
+            handler.writeOnly = False
+            reply = _TYPE.pack(msgType)
+        elif msgType in (_EIB_CACHE_READ, _EIB_CACHE_READ_SYNC) and len(frame) >= 4:
+            dest = _TYPE.unpack_from(frame, 2)[0]
+            with self.__lock:
+                enabled = self.__cacheEnabled
+                src, raw = self.__cache.get(dest, (0, b''))
+            # destination 0 signals a disabled cache, missing data a value not cached
+            reply = _CACHE_REPLY.pack(msgType, src, dest if enabled else 0) + raw
+        elif msgType in (_EIB_CACHE_ENABLE, _EIB_CACHE_DISABLE, _EIB_CACHE_CLEAR):
+            with self.__lock:
+                if msgType == _EIB_CACHE_CLEAR:
+                    self.__cache.clear()
+                else:
+                    self.__cacheEnabled = msgType == _EIB_CACHE_ENABLE
+            reply = _TYPE.pack(msgType)
+        elif msgType == _EIB_CACHE_REMOVE and len(frame) >= 4:
+            with self.__lock:
+                self.__cache.pop(_TYPE.unpack_from(frame, 2)[0], None)
+            reply = _TYPE.pack(msgType)
+        else:
+            reply = _TYPE.pack(_EIB_INVALID_REQUEST)
+
+        with self.__lock:
+            self.__framesSent += 1
+        handler.send(_FRAME_HEADER.pack(len(reply)) + reply)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="knxd stand-in speaking the eibd protocol")
+    parser.add_argument('listen', help="Unix socket path or host:port")
+    parser.add_argument('--rate', type=float, default=10.0, help="generated telegrams per second")
+    parser.add_argument('--latency', type=float, default=0.0, help="reply latency in seconds")
+    args = parser.parse_args()
+
+    if ':' in args.listen:
+        h, p = args.listen.rsplit(':', 1)
+        d = EIBStandInDaemon(host=h, port=int(p), rate=args.rate, latency=args.latency)
+    else:
+        d = EIBStandInDaemon(args.listen, rate=args.rate, latency=args.latency)
+    with d:
+        print("listening on {0}".format(d.url))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
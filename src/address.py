@@ -0,0 +1,142 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import re
+from functools import lru_cache
+
+# separator of the address levels, group and individual addresses accept both
+_ADDR_SEPARATOR = re.compile('[./]')
+
+# parsed addresses are memoized, a KNX installation uses a limited set of address strings
+_PARSE_CACHE_SIZE = 0x10000
+
+# text representation of all 65536 addresses, built on first use
+_groupText = None
+_groupSlashText = None
+_individualText = None
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def readaddr(addr, base=10) -> int:
+    """
+    converts individual address into int
+    :param addr:    individual address "1.1.3" resp. "1/1/3" or plain number
+    :param base:    base of plain numbers
+    :return:        individual address as int
+    :raises:        ValueError for invalid addresses
+    """
+    r = _ADDR_SEPARATOR.split(addr)
+
+    if len(r) == 3:
+        return ((int(r[0]) & 0x0f) << 12) | ((int(r[1]) & 0x0f) << 8) | (int(r[2]) & 0xff)
+    elif len(r) == 1:
+        return int(r[0], base) & 0xffff
+    raise ValueError("invalid individual address %s" % addr)
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def readgaddr(addr, base=10) -> int:
+    """
+    converts group address into int
+    :param addr:    3-level "1/0/3", 2-level "1/3" group address resp. with "." separator or plain number
+    :param base:    base of plain numbers
+    :return:        group address as int
+    :raises:        ValueError for invalid addresses
+    """
+    r = _ADDR_SEPARATOR.split(addr)
+
+    if len(r) == 3:
+        return ((int(r[0]) & 0x01f) << 11) | ((int(r[1]) & 0x07) << 8) | (int(r[2]) & 0xff)
+    elif len(r) == 2:
+        return ((int(r[0]) & 0x01f) << 11) | (int(r[1]) & 0x07FF)
+    elif len(r) == 1:
+        return int(r[0], base) & 0xffff
+    raise ValueError("invalid group address format %s" % addr)
+
+
+def readgaddrset(addr):
+    """
+    converts group address specification into the group addresses covered by it
+    :param addr:    single group address ("1/0/3"), main or middle group wildcard ("1/*/*", "1/*", "1/2/*"),
+                    range of group addresses ("1/0/0-1/0/255") or iterable of the former
+    :return:        range or frozenset of group addresses as int
+    """
+    if not isinstance(addr, str):
+        ret = set()
+        for a in addr:
+            ret.update(readgaddrset(a))
+        return frozenset(ret)
+
+    if '-' in addr:
+        first, last = addr.split('-', 1)
+        first = readgaddr(first.strip())
+        last = readgaddr(last.strip())
+        if last < first:
+            raise ValueError("invalid group address range %s" % addr)
+        return range(first, last + 1)
+
+    r = _ADDR_SEPARATOR.split(addr.strip())
+    if r[0] == '*':
+        return range(0, 0x10000)
+    if r[-1] == '*':
+        if len(r) == 2 or (len(r) == 3 and r[1] == '*'):
+            main = int(r[0]) & 0x1f
+            return range(main << 11, (main + 1) << 11)
+        elif len(r) == 3:
+            middle = ((int(r[0]) & 0x1f) << 11) | ((int(r[1]) & 0x07) << 8)
+            return range(middle, middle + 0x100)
+        raise ValueError("invalid group address wildcard %s" % addr)
+
+    ret = readgaddr(addr)
+    return range(ret, ret + 1)
+
+
+def printIndividual(addr) -> str:
+    """
+    converts individual address into its text representation "1.1.3"
+    """
+    global _individualText
+    if _individualText is None:
+        _individualText = tuple("%d.%d.%d" % ((a >> 12) & 0x0f, (a >> 8) & 0x0f, a & 0xff)
+                                for a in range(0x10000))
+    return _individualText[addr & 0xffff]
+
+
+def printGroup(addr) -> str:
+    """
+    converts group address into its text representation "1.0.3"
+    """
+    global _groupText
+    if _groupText is None:
+        _groupText = tuple("%d.%d.%d" % ((a >> 11) & 0x1f, (a >> 8) & 0x07, a & 0xff)
+                           for a in range(0x10000))
+    return _groupText[addr & 0xffff]
+
+
+def printGroupSlash(addr) -> str:
+    """
+    converts group address into its text representation "1/0/3" as used by knxtool
+    """
+    global _groupSlashText
+    if _groupSlashText is None:
+        _groupSlashText = tuple("%d/%d/%d" % ((a >> 11) & 0x1f, (a >> 8) & 0x07, a & 0xff)
+                                for a in range(0x10000))
+    return _groupSlashText[addr & 0xffff]
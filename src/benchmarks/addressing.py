@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Benchmark of group and individual address parsing and formatting on a stream of addresses.
+    Compares the former implementation (regex compiled per call, str.format per address)
+    with the memoized parser and lookup tables of the address module.
+"""
+
+from __future__ import print_function
+
+import random
+import re
+import time
+
+import address
+
+
+def _legacyReadgaddr(addr) -> int:
+    r = re.compile('[./]').split(addr)
+    if len(r) == 3:
+        return ((int(r[0]) & 0x01f) << 11) | ((int(r[1]) & 0x07) << 8) | (int(r[2]) & 0xff)
+    elif len(r) == 2:
+        return ((int(r[0]) & 0x01f) << 11) | (int(r[1]) & 0x07FF)
+    return int(r[0]) & 0xffff
+
+
+def _legacyReadaddr(addr) -> int:
+    r = re.compile('[./]').split(addr)
+    if len(r) == 3:
+        return ((int(r[0]) & 0x0f) << 12) | ((int(r[1]) & 0x0f) << 8) | (int(r[2]) & 0xff)
+    return int(r[0]) & 0xffff
+
+
+def _legacyPrintGroup(addr) -> str:
+    return "{0}.{1}.{2}".format((addr >> 11) & 0x1f, (addr >> 8) & 0x07, addr & 0xff)
+
+
+def _legacyPrintIndividual(addr) -> str:
+    return "{0}.{1}.{2}".format((addr >> 12) & 0x0f, (addr >> 8) & 0x0f, addr & 0xff)
+
+
+def measure(func, stream):
+    start = time.perf_counter()
+    for a in stream:
+        func(a)
+    return len(stream) / (time.perf_counter() - start)
+
+
+def run(count, distinct):
+    rnd = random.Random(0)
+    gaddrs = [rnd.randrange(0x10000) for _ in range(distinct)]
+    iaddrs = [rnd.randrange(0x10000) for _ in range(distinct)]
+    gstream = [rnd.choice(gaddrs) for _ in range(count)]
+    istream = [rnd.choice(iaddrs) for _ in range(count)]
+    gtexts = ["%d/%d/%d" % ((a >> 11) & 0x1f, (a >> 8) & 0x07, a & 0xff) for a in gstream]
+    itexts = [_legacyPrintIndividual(a) for a in istream]
+
+    assert [address.readgaddr(a) for a in gtexts[:1000]] == [_legacyReadgaddr(a) for a in gtexts[:1000]]
+    assert [address.printGroup(a) for a in gstream[:1000]] == [_legacyPrintGroup(a) for a in gstream[:1000]]
+
+    print("%-16s %16s %16s" % ("", "before [1/sec]", "after [1/sec]"))
+    for label, before, after, stream in (("readgaddr", _legacyReadgaddr, address.readgaddr, gtexts),
+                                         ("readaddr", _legacyReadaddr, address.readaddr, itexts),
+                                         ("printGroup", _legacyPrintGroup, address.printGroup, gstream),
+                                         ("printIndividual", _legacyPrintIndividual, address.printIndividual,
+                                          istream)):
+        print("%-16s %16.0f %16.0f" % (label, measure(before, stream), measure(after, stream)))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    count = int(args[0]) if args else 1000000
+    distinct = int(args[1]) if len(args) > 1 else 5000
+    run(count, distinct)
@@ -0,0 +1,75 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Benchmark of DPT 9.x/14.x decoding of recorded telegrams, requires NumPy.
+    Compares decoding one value at a time with decodeDPT against the vectorized decodeDPTArray,
+    for a padded APDU array as well as for a list of APDUs as received.
+"""
+
+from __future__ import print_function
+
+import random
+import time
+
+import numpy
+
+from dpt import decodeDPT, decodeDPTArray, encodeDPT
+
+
+def buildTelegrams(count):
+    rnd = random.Random(0)
+    dpts = [rnd.choice(("9.001", "14.056")) for _ in range(count)]
+    apdus = [encodeDPT(d, rnd.uniform(-300.0, 300.0)) for d in dpts]
+    return apdus, dpts
+
+
+def run(count):
+    apdus, dpts = buildTelegrams(count)
+    rows = numpy.zeros((count, 6), dtype=numpy.uint8)
+    for i, a in enumerate(apdus):
+        rows[i, :len(a)] = numpy.frombuffer(a, dtype=numpy.uint8)
+    lengths = numpy.fromiter(map(len, apdus), dtype=numpy.intp, count=count)
+    dptIds = numpy.asarray(dpts)
+
+    start = time.perf_counter()
+    single = [decodeDPT(d, a) for a, d in zip(apdus, dpts)]
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fromList = decodeDPTArray(apdus, dpts)
+    afterList = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fromArray = decodeDPTArray(rows, dptIds, lengths)
+    afterArray = time.perf_counter() - start
+
+    assert numpy.array_equal(fromList, numpy.asarray(single)) and numpy.array_equal(fromArray, fromList)
+    for label, elapsed in (("decodeDPT", before), ("decodeDPTArray (list)", afterList),
+                           ("decodeDPTArray (array)", afterArray)):
+        print("%-24s %12.0f values/sec" % (label, count / elapsed))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    run(int(args[0]) if args else 1000000)
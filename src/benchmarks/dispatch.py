@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Micro-benchmark of the listener dispatch in _EIBClientMonitor.
+    Compares the former linear scan of the listener list with the group address index,
+    reporting the dispatch cost per telegram for a growing number of registered listeners.
+"""
+
+from __future__ import print_function
+
+import random
+import time
+
+from common import *
+from EIBClient import EIBClientListener, _EIBClientMonitor
+from EIBConnection import EIBBuffer, Telegram, APCI_GROUP_WRITE
+
+
+class _NullListener(EIBClientListener):
+    def updateOccurred(self, srcAddr, val):
+        pass
+
+
+def _legacyDispatch(listenerList, gaddrInt, buf, srcAddr):
+    """
+    dispatch as implemented before the listener index, kept for comparison
+    """
+    ret = None
+    for rl in listenerList:
+        if rl.gaddrInt == gaddrInt:
+            if not ret:
+                ret = []
+            ret += [rl, ]
+    if ret is None:
+        return
+    for rl in ret:
+        rl.updateOccurred(srcAddr, buf.buffer)
+
+
+def run(listenerCounts, telegrams):
+    rnd = random.Random(0)
+    buf = EIBBuffer([0x00, 0x80, 0x01])
+    print("%10s %16s %16s %12s" % ("listeners", "before [us/tel]", "after [us/tel]", "register [us]"))
+    for count in listenerCounts:
+        listeners = [_NullListener(printGroup(rnd.randrange(0x10000))) for _ in range(count)]
+        dests = [rnd.choice(listeners).gaddrInt if rnd.random() < 0.5 else rnd.randrange(0x10000)
+                 for _ in range(telegrams)]
+
+        start = time.perf_counter()
+        for dest in dests:
+            _legacyDispatch(listeners, dest, buf, 0x1101)
+        before = (time.perf_counter() - start) / telegrams * 1e6
+
+        start = time.perf_counter()
+        for rl in listeners:
+            _EIBClientMonitor.addListener(rl)
+        register = (time.perf_counter() - start) / count * 1e6
+
+        records = [Telegram(0x1101, dest, APCI_GROUP_WRITE, buf.raw, 0.0) for dest in dests]
+        start = time.perf_counter()
+        for telegram in records:
+            _EIBClientMonitor.dispatch(telegram)
+        after = (time.perf_counter() - start) / telegrams * 1e6
+
+        for rl in listeners:
+            _EIBClientMonitor.removeListener(rl)
+
+        print("%10d %16.2f %16.2f %12.2f" % (count, before, after, register))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    telegrams = int(args[0]) if args else 2000
+    run([100, 1000, 3000, 10000], telegrams)
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Benchmark of receiving the telegrams of multiple daemons, each served by an EIBStandInDaemon.
+    Compares one thread blocked in EIBGetGroupTelegram per connection with a single EIBEventLoop,
+    reporting telegrams/sec, client threads as well as context switches and CPU time of the process
+    (including the stand-in daemons).
+"""
+
+from __future__ import print_function
+
+import os
+import resource
+import tempfile
+import threading
+import time
+
+from EIBClient import EIBClient
+from EIBEventLoop import EIBEventLoop
+from EIBStandInDaemon import EIBStandInDaemon
+
+
+class _Counter(object):
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self, telegram):
+        with self.lock:
+            self.count += 1
+
+
+def _contextSwitches():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def _push(daemons, count, rate):
+    """
+    sends count telegrams per daemon in chunks at the given rate per daemon
+    """
+    chunk = 100
+    telegrams = [(0x0800 + i, bytes((0x00, 0x80, i))) for i in range(chunk)]
+    start = time.perf_counter()
+    for sent in range(0, count, chunk):
+        for daemon in daemons:
+            daemon.pushMany(telegrams)
+        delay = start + (sent + chunk) / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def measure(daemons, count, rate, useLoop):
+    counter = _Counter()
+    threadsBefore = threading.active_count()
+    if useLoop:
+        loop = EIBEventLoop(counter.add)
+        for daemon in daemons:
+            loop.open(daemon.port)
+        loop.start()
+    else:
+        def receive(con):
+            while con.EIBGetGroupTelegram() is not None:
+                counter.add(None)
+
+        connections = []
+        for daemon in daemons:
+            con = EIBClient.createConnection(daemon.port)
+            con.EIBOpen_GroupSocket(0)
+            connections.append(con)
+            threading.Thread(target=receive, args=(con,), daemon=True).start()
+    # the stand-in serves each connection by a thread of its own
+    threads = threading.active_count() - threadsBefore - len(daemons)
+
+    total = count * len(daemons)
+    switches = _contextSwitches()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    _push(daemons, count, rate)
+    while counter.count < total and time.perf_counter() - start < 60:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    switches = _contextSwitches() - switches
+
+    if useLoop:
+        loop.close()
+    else:
+        for con in connections:
+            con.fd.shutdown(2)
+    return counter.count / elapsed, threads, switches, cpu
+
+
+def run(daemonCount, count, rate):
+    with tempfile.TemporaryDirectory() as tmp:
+        daemons = [EIBStandInDaemon(os.path.join(tmp, "eib%d" % i)).start() for i in range(daemonCount)]
+        print("%d daemons, %d telegrams each at %d/sec" % (daemonCount, count, rate))
+        print("%-18s %14s %8s %16s %10s" % ("", "telegrams/sec", "threads", "context switches", "cpu [s]"))
+        for label, useLoop in (("thread per daemon", False), ("event loop", True)):
+            print("%-18s %14.0f %8d %16d %10.2f" % ((label,) + measure(daemons, count, rate, useLoop)))
+        for daemon in daemons:
+            daemon.stop()
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    daemonCount = int(args[0]) if args else 6
+    count = int(args[1]) if len(args) > 1 else 20000
+    rate = int(args[2]) if len(args) > 2 else 5000
+    run(daemonCount, count, rate)
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Benchmark of the eibd frame reader on a local socketpair.
+    Compares the former per-frame reader (recv for header and body, per byte list conversion)
+    with the buffered reader of EIBConnection, reporting frames/sec and socket calls per burst.
+"""
+
+from __future__ import print_function
+
+import socket
+import struct
+import threading
+import time
+
+from EIBConnection import EIBConnection, EIBAddr, EIBBuffer
+
+
+class _CountingSocket(object):
+    """
+    socket proxy counting the calls issued to the kernel
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.calls = 0
+
+    def recv(self, bufsize):
+        self.calls += 1
+        return self.sock.recv(bufsize)
+
+    def recv_into(self, buffer):
+        self.calls += 1
+        return self.sock.recv_into(buffer)
+
+    def setblocking(self, flag):
+        self.calls += 1
+        return self.sock.setblocking(flag)
+
+
+class _LegacyReader(object):
+    """
+    frame reader as implemented before the buffered reader, kept for comparison
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.readlen = 0
+        self.datalen = 0
+
+    def EIBGetGroup_Src(self, buf, src, dest):
+        while True:
+            self.__checkRequest(True)
+            if self.readlen >= 2 and self.readlen >= self.datalen + 2:
+                self.readlen = 0
+                break
+        src.data = (self.data[2] << 8) | self.data[3]
+        dest.data = (self.data[4] << 8) | self.data[5]
+        buf.buffer = self.data[6:]
+        return len(self.data) - 6
+
+    def __checkRequest(self, block):
+        if self.readlen == 0:
+            self.head = []
+            self.data = []
+        if self.readlen < 2:
+            self.fd.setblocking(block)
+            result = self.fd.recv(2 - self.readlen)
+            for a in result:
+                self.head.append(ord(chr(a)))
+            self.readlen += len(result)
+        if self.readlen < 2:
+            return
+        self.datalen = (self.head[0] << 8) | self.head[1]
+        if self.readlen < self.datalen + 2:
+            self.fd.setblocking(block)
+            result = self.fd.recv(self.datalen + 2 - self.readlen)
+            for a in result:
+                self.data.append(ord(chr(a)))
+            self.readlen += len(result)
+
+
+def buildBurst(count):
+    """
+    creates a burst of group telegrams as sent by eibd after EIBOpen_GroupSocket
+    """
+    frames = []
+    for i in range(count):
+        body = struct.pack('>HHHBB', 39, 0x1101, i & 0xffff, 0x00, 0x80 | (i & 0x3f))
+        frames.append(struct.pack('>H', len(body)) + body)
+    return b''.join(frames)
+
+
+def newReader(legacy, sock):
+    if legacy:
+        return _LegacyReader(sock)
+    con = EIBConnection()
+    con.fd = sock
+    return con
+
+
+def countCalls(legacy, count):
+    """
+    :return:    socket calls needed to read a burst of count telegrams
+    """
+    rsock, wsock = socket.socketpair()
+    wsock.sendall(buildBurst(count))
+    proxy = _CountingSocket(rsock)
+    reader = newReader(legacy, proxy)
+    buf, src, dest = EIBBuffer(), EIBAddr(), EIBAddr()
+    for _ in range(count):
+        reader.EIBGetGroup_Src(buf, src, dest)
+    rsock.close()
+    wsock.close()
+    return proxy.calls
+
+
+def measure(legacy, count):
+    """
+    :return:    frames/sec reading count telegrams written by a concurrent sender
+    """
+    rsock, wsock = socket.socketpair()
+    data = buildBurst(count)
+    sender = threading.Thread(target=wsock.sendall, args=(data,))
+    reader = newReader(legacy, rsock)
+    buf, src, dest = EIBBuffer(), EIBAddr(), EIBAddr()
+    start = time.perf_counter()
+    sender.start()
+    for _ in range(count):
+        reader.EIBGetGroup_Src(buf, src, dest)
+    elapsed = time.perf_counter() - start
+    sender.join()
+    rsock.close()
+    wsock.close()
+    return count / elapsed
+
+
+def run(count, burst):
+    for label, legacy in (("before", True), ("after", False)):
+        print("%-7s %10.0f frames/sec, %5d socket calls for a burst of %d telegrams" %
+              (label, measure(legacy, count), countCalls(legacy, burst), burst))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    count = int(args[0]) if args else 200000
+    burst = int(args[1]) if len(args) > 1 else 500
+    run(count, burst)
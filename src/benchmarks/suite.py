@@ -0,0 +1,274 @@
+#!/usr/bin/python
+
+#
+#   EIB/KNX client implementation for Python
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+    Benchmark suite of the client's hot paths, run against an in-process EIBStandInDaemon.
+    Measures monitor receive throughput, group cache read latency, group write rate, listener dispatch cost
+    for a growing number of listeners and address/value formatting of common.py.
+    Results are written as JSON, compare mode flags metrics that regressed beyond a threshold:
+        python -m benchmarks.suite --output before.json
+        python -m benchmarks.suite --output after.json --compare before.json --threshold 0.1
+    The exit status is 1 if a regression has been found.
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+
+import common
+from EIBClient import EIBClientListener, _EIBClient, _EIBClientMonitor
+from EIBConnection import EIBAddr, EIBBuffer, Telegram, APCI_GROUP_WRITE
+from EIBStandInDaemon import EIBStandInDaemon
+
+_HIGHER = 'higher'
+_LOWER = 'lower'
+
+# telegrams handed to the stand-in per write while measuring receive throughput
+_PUSH_CHUNK = 1000
+# in-process benchmarks are repeated, the fastest run is reported to reduce noise
+_REPEAT = 3
+
+
+class _NullListener(EIBClientListener):
+    def updateOccurred(self, srcAddr, val):
+        pass
+
+
+def _metric(value, unit, better) -> dict:
+    """
+    :param better:  _HIGHER if higher values are better (rates), _LOWER otherwise (durations)
+    """
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def _fastest(func, stream) -> float:
+    """
+    :return:    seconds of the fastest of _REPEAT runs calling func for each item of stream
+    """
+    best = None
+    for _ in range(_REPEAT):
+        start = time.perf_counter()
+        for item in stream:
+            func(item)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def benchReceive(daemon, count) -> dict:
+    """
+    telegrams per second received on a group socket via EIBGetGroup_Src
+    """
+    con = _EIBClient.createConnection(daemon.port)
+    if con.EIBOpen_GroupSocket(0) == -1:
+        raise ConnectionError("Open group socket failed")
+    chunk = [(0x0800 + i % 256, bytes((0x00, 0x80, 0x0c, i & 0xff))) for i in range(_PUSH_CHUNK)]
+
+    def pushAll():
+        for i in range(0, count, _PUSH_CHUNK):
+            daemon.pushMany(chunk[:min(_PUSH_CHUNK, count - i)])
+
+    pusher = threading.Thread(target=pushAll)
+    buf, src, dest = EIBBuffer(), EIBAddr(), EIBAddr()
+    start = time.perf_counter()
+    pusher.start()
+    for _ in range(count):
+        if con.EIBGetGroup_Src(buf, src, dest) == -1:
+            raise ConnectionError("Receive failed")
+    elapsed = time.perf_counter() - start
+    pusher.join()
+    con.EIBClose()
+    return {'receive.telegramsPerSec': _metric(count / elapsed, "1/s", _HIGHER)}
+
+
+def benchCacheRead(daemon, count) -> dict:
+    """
+    round trip latency of GroupCache_Read
+    """
+    gaddrs = ["1/0/%d" % i for i in range(256)]
+    for i in range(256):
+        daemon.setValue(0x0800 + i, bytes((0x00, 0x80, 0x0c, i)))
+    client = _EIBClient()
+    client.setEIBConnection(daemon.port)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        client.GroupCache_Read(gaddrs[i % 256])
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    client.flush()
+    return {'cacheRead.readsPerSec': _metric(count / elapsed, "1/s", _HIGHER),
+            'cacheRead.p50': _metric(_percentile(latencies, 0.5) * 1e6, "us", _LOWER),
+            'cacheRead.p99': _metric(_percentile(latencies, 0.99) * 1e6, "us", _LOWER)}
+
+
+def benchWrite(daemon, count) -> dict:
+    """
+    rate of Group_Write_DPTVal until all telegrams have arrived at the daemon
+    """
+    client = _EIBClient()
+    client.setEIBConnection(daemon.port)
+    # open the group socket before measuring
+    client.Group_Write_DPTVal("1/0/0", 0.0, "9.001")
+    written = daemon.getStatistics()['groupWrites'] + count
+    start = time.perf_counter()
+    for i in range(count):
+        client.Group_Write_DPTVal("1/0/%d" % (i % 256), i * 0.5, "9.001")
+    deadline = time.perf_counter() + 10.0
+    while daemon.getStatistics()['groupWrites'] < written and time.perf_counter() < deadline:
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - start
+    client.flush()
+    return {'write.writesPerSec': _metric(count / elapsed, "1/s", _HIGHER)}
+
+
+def benchDispatch(listenerCounts, count) -> dict:
+    """
+    cost of _EIBClientMonitor.dispatch per telegram, half of the telegrams are addressed to a listener
+    """
+    rnd = random.Random(0)
+    raw = bytes((0x00, 0x80, 0x01))
+    results = {}
+    for listenerCount in listenerCounts:
+        listeners = [_NullListener(common.printGroupSlash(rnd.randrange(0x10000))) for _ in range(listenerCount)]
+        records = [Telegram(0x1101,
+                            rnd.choice(listeners).gaddrInt if rnd.random() < 0.5 else rnd.randrange(0x10000),
+                            APCI_GROUP_WRITE, raw, 0.0)
+                   for _ in range(count)]
+        for rl in listeners:
+            _EIBClientMonitor.addListener(rl)
+        try:
+            elapsed = _fastest(_EIBClientMonitor.dispatch, records)
+        finally:
+            for rl in listeners:
+                _EIBClientMonitor.removeListener(rl)
+        results['dispatch.%d.usPerTelegram' % listenerCount] = _metric(elapsed / count * 1e6, "us", _LOWER)
+    return results
+
+
+def benchFormatting(count) -> dict:
+    """
+    address and value conversions of common.py on a stream of random values
+    """
+    rnd = random.Random(0)
+    addrs = [rnd.randrange(0x10000) for _ in range(count)]
+    gtexts = [common.printGroupSlash(a) for a in addrs]
+    itexts = [common.printIndividual(a) for a in addrs]
+    values = [[0x00, 0x80, a >> 8, a & 0xff] for a in addrs]
+    hexTexts = [common.printValue(v, len(v)).strip() for v in values]
+    results = {}
+    for label, func, stream in (("readgaddr", common.readgaddr, gtexts),
+                                ("readaddr", common.readaddr, itexts),
+                                ("printGroup", common.printGroup, addrs),
+                                ("printIndividual", common.printIndividual, addrs),
+                                ("printValue", lambda v: common.printValue(v, len(v)), values),
+                                ("readValue", common.readValue, hexTexts)):
+        results['format.%s.opsPerSec' % label] = _metric(count / _fastest(func, stream), "1/s", _HIGHER)
+    return results
+
+
+def run(count=20000, listenerCounts=(10, 100, 1000, 10000), tcp=False) -> dict:
+    """
+    :param count:   number of operations per benchmark
+    :param tcp:     connect to the stand-in via TCP instead of a Unix socket
+    :return:        metrics by name
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = None if tcp else os.path.join(tmp, "eib")
+        with EIBStandInDaemon(path) as daemon:
+            metrics.update(benchReceive(daemon, count * 5))
+            metrics.update(benchCacheRead(daemon, count))
+            metrics.update(benchWrite(daemon, count))
+    metrics.update(benchDispatch(listenerCounts, count))
+    metrics.update(benchFormatting(count * 5))
+    return metrics
+
+
+def compare(metrics, baseline, threshold) -> list:
+    """
+    :param metrics:     metrics of the current run
+    :param baseline:    metrics of a previous run
+    :param threshold:   relative change tolerated, e.g. 0.1 for 10%
+    :return:            names of the metrics regressed beyond threshold
+    """
+    regressions = []
+    print("%-34s %14s %14s %9s" % ("metric", "baseline", "current", "change"))
+    for name in sorted(metrics):
+        if name not in baseline or not baseline[name]['value']:
+            continue
+        before = baseline[name]['value']
+        after = metrics[name]['value']
+        change = (after - before) / before
+        if metrics[name]['better'] == _LOWER:
+            regressed = change > threshold
+        else:
+            regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print("%-34s %14.2f %14.2f %+8.1f%%%s" % (name, before, after, change * 100,
+                                                  "  REGRESSION" if regressed else ""))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="benchmark suite against an in-process knxd stand-in")
+    parser.add_argument('--output', help="file the results are written to as JSON, stdout if not set")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative change flagged as regression")
+    parser.add_argument('--count', type=int, default=20000, help="operations per benchmark")
+    parser.add_argument('--tcp', action='store_true', help="connect via TCP instead of a Unix socket")
+    args = parser.parse_args()
+
+    result = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'time': time.time(),
+              'count': args.count,
+              'metrics': run(args.count, tcp=args.tcp)}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+    elif not args.compare:
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result['metrics'], baseline['metrics'], args.threshold)
+        if regressions:
+            print("%d metric(s) regressed by more than %.0f%%" % (len(regressions), args.threshold * 100))
+            sys.exit(1)
@@ -21,17 +21,11 @@
 
 import re
 
+from address import printGroup, printGroupSlash, printIndividual, readaddr, readgaddr, readgaddrset
+from dpt import decodeDPT, encodeDPT
 
-def printIndividual(addr) -> str:
-    return "{0}.{1}.{2}".format((addr >> 12) & 0x0f,
-                                (addr >> 8) & 0x0f,
-                                addr & 0xff)
-
-
-def printGroup(addr) -> str:
-    return "{0}.{1}.{2}".format((addr >> 11) & 0x1f,
-                                (addr >> 8) & 0x07,
-                                addr & 0xff)
+# separator of the bytes within a hex string value
+_HEX_SEPARATOR = re.compile(r"[ \t]")
 
 
 def printValue(buffer, rlen) -> str:
@@ -62,34 +56,34 @@ def printHex(len, buf) -> str:
     return ret
 
 
-def readaddr(addr) -> int:
-    ret = None
-    r = re.compile('[./]').split(addr)
-
-    if len(r) == 3:
-        ret = ((int(r[0]) & 0x0f) << 12) | ((int(r[1]) & 0x0f) << 8) | (int(r[2]) & 0xff)
-    elif len(r) == 1:
-        ret = int(r[0]) & 0xffff
-    else:
-        raise ValueError("invalid individual address %s" % addr)
-
-    return ret
-
-
-def readgaddr(addr) -> int:
-    ret = None
-    r = re.compile('[./]').split(addr)
+def convertValue(buffer, dpt=None):
+    """
+    converts the APDU of a group telegram into the value returned to the caller
+    :param buffer:  APDU including TPCI/APCI
+    :param dpt:     datapoint type ("9.001") to decode the native value, None for hex string representation
+    :return:        native value resp. hex string, None if the telegram does not carry a value
+    """
+    if dpt is None:
+        return printValue(buffer, len(buffer))
+    return decodeDPT(dpt, buffer)
 
-    if len(r) == 3:
-        ret = ((int(r[0]) & 0x01f) << 11) | ((int(r[1]) & 0x07) << 8) | (int(r[2]) & 0xff)
-    elif len(r) == 2:
-        ret = ((int(r[0]) & 0x01f) << 11) | (int(r[1]) & 0x07FF)
-    elif len(r) == 1:
-        ret = int(r[0]) & 0xffff
-    else:
-        raise ValueError("invalid group address format %s" % addr)
 
-    return ret
+def readValue(val, dpt=None) -> bytes:
+    """
+    converts hex representation of a value into the APDU of a group value write
+    counterpart of printValue resp. convertValue
+    :param val:     value as hex string, bytes separated by blanks ("44 B1 00 01"), native value if dpt is given
+    :param dpt:     datapoint type ("9.001") of the native value, None for hex string representation
+    :return:        APDU for transmission
+    :raises:        ValueError for invalid hex bytes resp. values not matching the datapoint type
+    """
+    if dpt is not None:
+        return encodeDPT(dpt, val)
+    try:
+        # APDU starts with 0x00 0x80 for group value write
+        return bytes([0x00, 0x80] + [readHex(v) for v in _HEX_SEPARATOR.split(val)])
+    except (ValueError, TypeError):
+        raise ValueError("Invalid hex bytes - {0}".format(val))
 
 
 def readBlock(buf, vals):
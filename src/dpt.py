@@ -0,0 +1,313 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+
+import math
+import struct
+
+# APCI of a group value write, values of small datapoint types are embedded into its lower 6 bits
+_APCI_WRITE = 0x80
+_APCI_VALUE = 0xC0
+_APCI_HEADER = struct.Struct('>BB')
+
+_DPT9 = struct.Struct('>H')
+
+# NumPy dtypes matching the struct formats of the value, NumPy is only required for bulk decoding
+_ARRAY_DTYPES = {'B': 'u1', 'b': 'i1', 'H': '>u2', 'h': '>i2', 'I': '>u4', 'i': '>i4', 'f': '>f4'}
+
+
+class DPTCodec(object):
+    """
+    Encoder and decoder of one KNX datapoint type
+    Values are converted from resp. to the complete APDU as it is used by EIBGetGroup_Src, EIB_Cache_Read and
+    EIBSendGroup, including the two leading TPCI/APCI bytes
+    """
+    __slots__ = ('dpt', 'size', 'decode', 'encode', 'decodeArray')
+
+    def __init__(self, dpt, size, decode, encode, decodeArray=None):
+        """
+        :param dpt:         datapoint type identifier, e.g. "9" or "5.001"
+        :param size:        size of the value in bytes following the APCI, 0 for values embedded into the APCI
+        :param decode:      function converting the APDU into the native value
+        :param encode:      function converting the native value into the APDU of a group value write
+        :param decodeArray: function converting a 2-dimensional uint8 NumPy array of APDUs into an array of
+                            float64 values, None if the datapoint type cannot be decoded in bulk
+        """
+        self.dpt = dpt
+        self.size = size
+        self.decode = decode
+        self.encode = encode
+        self.decodeArray = decodeArray
+
+    def __repr__(self):
+        return "DPTCodec({0})".format(self.dpt)
+
+
+def _checkSize(dpt, raw, size):
+    if len(raw) < 2 + size:
+        raise ValueError("Value too short for DPT {0} - {1} bytes".format(dpt, len(raw)))
+
+
+def _structCodec(dpt, fmt, scale=None):
+    """
+    codec for datapoint types represented by a single struct field following the APCI
+    :param fmt:     struct format of the value
+    :param scale:   factor between native and transmitted value of scaled subtypes, e.g. percent
+    """
+    value = struct.Struct('>' + fmt)
+    apdu = struct.Struct('>BB' + fmt)
+    size = value.size
+    unpack = value.unpack_from
+    pack = apdu.pack
+
+    if scale is None:
+        def decode(raw):
+            _checkSize(dpt, raw, size)
+            return unpack(raw, 2)[0]
+
+        def encode(val):
+            try:
+                if fmt == 'f' and not math.isfinite(val):
+                    raise ValueError("{0} out of range".format(val))
+                return pack(0, _APCI_WRITE, val)
+            except (struct.error, TypeError, ValueError, OverflowError) as e:
+                raise ValueError("Invalid value for DPT {0} - {1}".format(dpt, e))
+    else:
+        def decode(raw):
+            _checkSize(dpt, raw, size)
+            return round(unpack(raw, 2)[0] / scale)
+
+        def encode(val):
+            try:
+                return pack(0, _APCI_WRITE, int(round(val * scale)))
+            except (struct.error, TypeError, ValueError, OverflowError) as e:
+                raise ValueError("Invalid value for DPT {0} - {1}".format(dpt, e))
+
+    def decodeArray(np, apdus):
+        vals = np.ascontiguousarray(apdus[:, 2:2 + size]).view(_ARRAY_DTYPES[fmt])[:, 0].astype(np.float64)
+        return np.round(vals / scale) if scale else vals
+
+    return DPTCodec(dpt, size, decode, encode, decodeArray)
+
+
+def _bitCodec(dpt):
+    """
+    codec for DPT 1.x, the boolean value is embedded into the APCI
+    """
+    def decode(raw):
+        _checkSize(dpt, raw, 0)
+        return bool(raw[1] & 0x01)
+
+    def encode(val):
+        return _APCI_HEADER.pack(0, _APCI_WRITE | (0x01 if val else 0x00))
+
+    def decodeArray(np, apdus):
+        return (apdus[:, 1] & 0x01).astype(np.float64)
+
+    return DPTCodec(dpt, 0, decode, encode, decodeArray)
+
+
+def _floatCodec(dpt):
+    """
+    codec for DPT 9.x, the KNX 2-byte float
+    value = 0.01 * M * 2^E, encoded as MEEEEMMM MMMMMMMM with a 12-bit two's complement mantissa
+    """
+    unpack = _DPT9.unpack_from
+
+    def decode(raw):
+        _checkSize(dpt, raw, 2)
+        v = unpack(raw, 2)[0]
+        m = v & 0x07ff
+        if v & 0x8000:
+            m -= 0x0800
+        return round(0.01 * (m << ((v >> 11) & 0x0f)), 2)
+
+    def encode(val):
+        try:
+            v = val * 100.0
+        except TypeError as e:
+            raise ValueError("Invalid value for DPT {0} - {1}".format(dpt, e))
+        if not math.isfinite(v):
+            raise ValueError("Invalid value for DPT {0} - {1} out of range".format(dpt, val))
+        e = 0
+        while v < -2048 or v > 2047:
+            v /= 2
+            e += 1
+        m = int(round(v))
+        if m > 2047:
+            m >>= 1
+            e += 1
+        if e > 15:
+            raise ValueError("Invalid value for DPT {0} - {1} out of range".format(dpt, val))
+        v = (e << 11) | (m & 0x07ff)
+        if m < 0:
+            v |= 0x8000
+        return _APCI_HEADER.pack(0, _APCI_WRITE) + _DPT9.pack(v)
+
+    def decodeArray(np, apdus):
+        v = (apdus[:, 2].astype(np.int32) << 8) | apdus[:, 3]
+        m = (v & 0x07ff) - ((v & 0x8000) >> 4)
+        return np.round(0.01 * m * np.exp2((v >> 11) & 0x0f), 2)
+
+    return DPTCodec(dpt, 2, decode, encode, decodeArray)
+
+
+def _stringCodec(dpt, encoding):
+    """
+    codec for DPT 16.x, 14 character strings padded with NUL
+    """
+    def decode(raw):
+        _checkSize(dpt, raw, 0)
+        return bytes(raw[2:16]).rstrip(b'\x00').decode(encoding)
+
+    def encode(val):
+        try:
+            data = val.encode(encoding)
+        except (UnicodeEncodeError, AttributeError) as e:
+            raise ValueError("Invalid value for DPT {0} - {1}".format(dpt, e))
+        if len(data) > 14:
+            raise ValueError("Invalid value for DPT {0} - more than 14 characters".format(dpt))
+        return _APCI_HEADER.pack(0, _APCI_WRITE) + data.ljust(14, b'\x00')
+
+    return DPTCodec(dpt, 14, decode, encode)
+
+
+# codecs by main type resp. by main type and subtype for subtypes deviating from their main type
+_CODECS = {
+    "1":        _bitCodec("1"),
+    "5":        _structCodec("5", 'B'),
+    "5.001":    _structCodec("5.001", 'B', 255 / 100.0),
+    "5.003":    _structCodec("5.003", 'B', 255 / 360.0),
+    "6":        _structCodec("6", 'b'),
+    "7":        _structCodec("7", 'H'),
+    "8":        _structCodec("8", 'h'),
+    "9":        _floatCodec("9"),
+    "12":       _structCodec("12", 'I'),
+    "13":       _structCodec("13", 'i'),
+    "14":       _structCodec("14", 'f'),
+    "16":       _stringCodec("16", 'ascii'),
+    "16.001":   _stringCodec("16.001", 'latin-1'),
+}
+
+
+def getCodec(dpt):
+    """
+    looks up the codec of a datapoint type
+    :param dpt: datapoint type as string "9.001", "DPT9" or "9" resp. as number 9, also accepts a DPTCodec
+    :return:    the matching DPTCodec, subtypes without dedicated codec share the codec of their main type
+    :raises ValueError: if the datapoint type is not supported
+    """
+    if isinstance(dpt, DPTCodec):
+        return dpt
+    key = str(dpt).strip().upper()
+    if key.startswith("DPT"):
+        key = key[3:].lstrip("-_ ")
+    codec = _CODECS.get(key)
+    if codec is None:
+        main, _, sub = key.replace("-", ".").partition(".")
+        codec = _CODECS.get(main + "." + sub.zfill(3)) if sub else None
+        if codec is None:
+            codec = _CODECS.get(main)
+        if codec is None:
+            raise ValueError("Unsupported datapoint type - {0}".format(dpt))
+        # memoize the resolved identifier
+        _CODECS[key] = codec
+    return codec
+
+
+def decodeDPT(dpt, raw):
+    """
+    converts the APDU of a group telegram into its native value
+    :param dpt: datapoint type, see getCodec
+    :param raw: APDU including TPCI/APCI as bytes, bytearray, memoryview or list of ints
+    :return:    native value, None for telegrams not carrying a value (group value read)
+    """
+    if len(raw) < 2 or not raw[1] & _APCI_VALUE:
+        return None
+    if isinstance(raw, list):
+        raw = bytes(raw)
+    return getCodec(dpt).decode(raw)
+
+
+def encodeDPT(dpt, val):
+    """
+    converts a native value into the APDU of a group value write
+    :param dpt: datapoint type, see getCodec
+    :param val: native value
+    :return:    APDU as bytes to be sent with EIBSendGroup
+    """
+    return getCodec(dpt).encode(val)
+
+
+def decodeDPTArray(apdus, dpts, lengths=None):
+    """
+    decodes the values of many telegrams in bulk, e.g. for the analysis of recorded traffic
+    rows are grouped by datapoint type and each group is decoded in a single vectorized pass,
+    requires NumPy
+    :param apdus:   APDUs including TPCI/APCI, either a 2-dimensional uint8 array with one zero padded APDU per row
+                    or a sequence of bytes
+    :param dpts:    datapoint type for all rows or sequence with the datapoint type of each row
+    :param lengths: length of each APDU if apdus is a padded array, None if all rows are completely filled
+    :return:        float64 array of the values, NaN for telegrams not carrying a value, too short telegrams
+                    and datapoint types without bulk decoder (DPT 16)
+    :raises ValueError: for unsupported datapoint types
+    """
+    np = _numpy()
+    if isinstance(apdus, np.ndarray):
+        apdus = np.asarray(apdus, dtype=np.uint8)
+        if lengths is None:
+            lengths = np.full(len(apdus), apdus.shape[1] if apdus.ndim == 2 else 0)
+    else:
+        lengths = np.fromiter(map(len, apdus), dtype=np.intp, count=len(apdus))
+        width = int(lengths.max()) if len(apdus) else 0
+        apdus = np.frombuffer(b''.join([bytes(a).ljust(width, b'\x00') for a in apdus]),
+                              dtype=np.uint8).reshape(len(apdus), width)
+    lengths = np.asarray(lengths)
+
+    vals = np.full(len(apdus), np.nan)
+    if not len(apdus) or apdus.shape[1] < 2:
+        return vals
+    valid = (lengths >= 2) & ((apdus[:, 1] & _APCI_VALUE) != 0)
+
+    if isinstance(dpts, (str, int, DPTCodec)):
+        groups = [(getCodec(dpts), valid)]
+    else:
+        ids, inverse = np.unique(np.asarray(dpts).astype(str), return_inverse=True)
+        groups = [(getCodec(d), valid & (inverse == i)) for i, d in enumerate(ids)]
+
+    for codec, rows in groups:
+        if codec.decodeArray is None:
+            continue
+        rows &= lengths >= 2 + codec.size
+        if apdus.shape[1] < 2 + codec.size or not rows.any():
+            continue
+        vals[rows] = codec.decodeArray(np, apdus[rows])
+    return vals
+
+
+def _numpy():
+    """
+    NumPy is an optional dependency, only imported when bulk decoding is used
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Bulk decoding of datapoint types requires NumPy - pip install numpy")
+    return numpy
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+#
+#   EIBD client library
+#   Copyright (C) 2005-2011 Martin Koegler <mkoegler@auto.tuwien.ac.at>
+#
+#   Adapted to EIB/KNX client implementation for Python by:
+#   Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   In addition to the permissions in the GNU General Public License,
+#   you may link the compiled version of this file into combinations
+#   with other programs, and distribute those combinations without any
+#   restriction coming from the use of this file. (The General Public
+#   License restrictions do apply in other respects; for example, they
+#   cover modification of the file, and distribution when not linked into
+#   a combine executable.)
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the Free Software
+#   Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+
+from __future__ import print_function
+
+import time
+
+from common import *
+from EIBClient import EIBClient, EIBClientFactory
+from EIBRecorder import EIBRecorder, EIBRecordReader
+
+
+def record(port, path):
+    """
+    records all group telegrams to a binary file until interrupted
+    """
+    c = EIBClient.createConnection(port)
+    c.EIBOpen_GroupSocket(0)
+    with EIBRecorder(path) as recorder:
+        try:
+            while True:
+                telegram = c.EIBGetGroupTelegram()
+                if telegram is None:
+                    break
+                recorder.record(telegram)
+        except KeyboardInterrupt:
+            pass
+        print("%d telegrams recorded" % recorder.recordCount)
+
+
+def dump(path, start=None, end=None):
+    """
+    prints the telegrams recorded within a time range
+    """
+    with EIBRecordReader(path) as reader:
+        for t in reader.read(start, end):
+            print("%s %s > %s: %s" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t.timestamp)),
+                                      printIndividual(t.src), printGroupSlash(t.dest),
+                                      printHex(len(t.payload), t.payload)))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = list(sys.argv[1:])
+    if len(args) >= 2 and args[0] == 'dump':
+        # dump <file> [<start> [<end>]], times as seconds since epoch
+        dump(args[1], *[float(a) for a in args[2:4]])
+    elif len(args) >= 2 and args[0] == 'record':
+        # record <file> [<port>]
+        record(args[2] if len(args) > 2 else EIBClientFactory.findDaemonPort(), args[1])
+    else:
+        print("usage: GroupRecorder.py record <file> [<port>] | dump <file> [<start> [<end>]]")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules of the client are imported as top-level modules, as done by running from src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
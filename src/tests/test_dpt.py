@@ -0,0 +1,48 @@
+"""
+    EIB/KNX client implementation for Python based on the great work by:
+    - Martin Koegler <mkoegler@auto.tuwien.ac.at>
+    - Mathias Urlichs <http://matthias.urlichs.de/>
+
+    Copyright (C) 2021 Michael Bernhardt [https://github.com/MBizm]
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+    You should have received a copy of the GNU General Public License
+    along with this program; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+    Run from src: python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from dpt import decodeDPT, encodeDPT
+
+
+class DPT14Test(unittest.TestCase):
+
+    def testRoundTrip(self):
+        self.assertEqual(decodeDPT("14", encodeDPT("14", 1.5)), 1.5)
+
+    def testOutOfRange(self):
+        with self.assertRaises(ValueError):
+            encodeDPT("14", 1e40)
+
+    def testNonFinite(self):
+        for val in (float('nan'), float('inf'), float('-inf')):
+            with self.assertRaises(ValueError):
+                encodeDPT("14", val)
+
+    def testNonNumeric(self):
+        with self.assertRaises(ValueError):
+            encodeDPT("14", "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()